@@ -0,0 +1,221 @@
+import json
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, update
+from sqlmodel import Session, select
+
+from app.models import User, WorkoutLog, Exercise, DailyWorkoutRollup, DailyMuscleRollup, UserStats
+
+
+def dialect_insert(bind, model):
+    """INSERT supporting ON CONFLICT for the dialects we run on, or None
+
+    ``bind`` is a Session or a Connection.
+    """
+    dialect = (bind.get_bind() if hasattr(bind, "get_bind") else bind).dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+    return dialect_insert(model)
+
+
+def increment_rows(session: Session, model, key_columns: List[str], rows: List[Dict]):
+    """Add the non-key values of each row onto the matching counters, creating missing rows"""
+    if not rows:
+        return
+    table = model.__table__
+    counter_columns = [column for column in rows[0] if column not in key_columns]
+
+    statement = dialect_insert(session, model)
+    if statement is not None:
+        statement = statement.on_conflict_do_update(
+            index_elements=key_columns,
+            set_={column: table.c[column] + statement.excluded[column] for column in counter_columns}
+        )
+        session.execute(statement, rows)
+        return
+
+    for row in rows:
+        result = session.execute(
+            update(model)
+            .where(*(table.c[column] == row[column] for column in key_columns))
+            .values({column: table.c[column] + row[column] for column in counter_columns})
+        )
+        if result.rowcount == 0:
+            session.execute(insert(model).values(**row))
+
+
+def apply_workout_logs(session: Session, entries: Iterable[Tuple[WorkoutLog, str]]):
+    """Fold newly written workout logs into the rollup tables
+
+    ``entries`` pairs each log with its exercise's target muscle. Runs inside
+    the caller's transaction so rollups commit or roll back with the logs.
+    """
+    days: Dict[tuple, Dict[str, int]] = defaultdict(lambda: {"workouts_count": 0, "total_duration": 0})
+    muscles: Dict[tuple, int] = defaultdict(int)
+    users: Dict[int, Dict[str, Any]] = defaultdict(lambda: {
+        "total_workouts": 0, "total_seconds": 0, "total_minutes": 0,
+        "first_workout_at": None, "muscle_group_counts": defaultdict(int)
+    })
+
+    for log, target_muscle in entries:
+        day = log.completed_at.date()
+        days[(log.user_id, day)]["workouts_count"] += 1
+        days[(log.user_id, day)]["total_duration"] += log.duration_completed or 0
+        muscles[(log.user_id, day, target_muscle)] += 1
+
+        user = users[log.user_id]
+        user["total_workouts"] += 1
+        user["total_seconds"] += log.duration_completed or 0
+        user["total_minutes"] += (log.duration_completed or 0) // 60
+        if user["first_workout_at"] is None or log.completed_at < user["first_workout_at"]:
+            user["first_workout_at"] = log.completed_at
+        user["muscle_group_counts"][target_muscle] += 1
+
+    increment_rows(session, DailyWorkoutRollup, ["user_id", "day"], [
+        {"user_id": user_id, "day": day, **totals} for (user_id, day), totals in days.items()
+    ])
+    increment_rows(session, DailyMuscleRollup, ["user_id", "day", "muscle_group"], [
+        {"user_id": user_id, "day": day, "muscle_group": muscle, "workouts_count": count}
+        for (user_id, day, muscle), count in muscles.items()
+    ])
+    _apply_user_stats(session, users)
+
+
+def _apply_user_stats(session: Session, users: Dict[int, Dict[str, Any]]):
+    increment_rows(session, UserStats, ["user_id"], [
+        {
+            "user_id": user_id,
+            "total_workouts": totals["total_workouts"],
+            "total_seconds": totals["total_seconds"],
+            "total_minutes": totals["total_minutes"]
+        }
+        for user_id, totals in users.items()
+    ])
+
+    # The upsert above created or locked each row; merge the non-additive fields
+    for user_id, totals in users.items():
+        stats = session.exec(
+            select(UserStats)
+            .where(UserStats.user_id == user_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        ).one()
+        if stats.first_workout_at is None or totals["first_workout_at"] < stats.first_workout_at:
+            stats.first_workout_at = totals["first_workout_at"]
+        counts = load_muscle_group_counts(stats)
+        for muscle, count in totals["muscle_group_counts"].items():
+            counts[muscle] = counts.get(muscle, 0) + count
+        stats.muscle_group_counts = json.dumps(counts)
+        session.add(stats)
+
+
+def load_muscle_group_counts(stats: Optional[UserStats]) -> Dict[str, int]:
+    if stats is None or not stats.muscle_group_counts:
+        return {}
+    return json.loads(stats.muscle_group_counts)
+
+
+def compute_user_stats(session: Session, user_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """Recompute lifetime stats for the given users directly from their workout logs"""
+    in_batch = WorkoutLog.user_id.in_(user_ids)
+    duration = func.coalesce(WorkoutLog.duration_completed, 0)
+
+    computed: Dict[int, Dict[str, Any]] = {}
+    totals = session.exec(
+        select(
+            WorkoutLog.user_id, func.count(WorkoutLog.id), func.sum(duration),
+            func.sum(duration // 60), func.min(WorkoutLog.completed_at)
+        ).where(in_batch).group_by(WorkoutLog.user_id)
+    ).all()
+    for user_id, count, seconds, minutes, first_workout_at in totals:
+        computed[user_id] = {
+            "total_workouts": count,
+            "total_seconds": seconds or 0,
+            "total_minutes": minutes or 0,
+            "first_workout_at": first_workout_at,
+            "muscle_group_counts": {}
+        }
+
+    muscle_counts = session.exec(
+        select(WorkoutLog.user_id, Exercise.target_muscle, func.count(WorkoutLog.id))
+        .join(Exercise)
+        .where(in_batch)
+        .group_by(WorkoutLog.user_id, Exercise.target_muscle)
+    ).all()
+    for user_id, muscle, count in muscle_counts:
+        computed[user_id]["muscle_group_counts"][muscle] = count
+
+    return computed
+
+
+def user_stats_as_dict(stats: Optional[UserStats]) -> Optional[Dict[str, Any]]:
+    """Stored stats in the same shape compute_user_stats returns"""
+    if stats is None or not stats.total_workouts:
+        return None
+    return {
+        "total_workouts": stats.total_workouts,
+        "total_seconds": stats.total_seconds,
+        "total_minutes": stats.total_minutes,
+        "first_workout_at": stats.first_workout_at,
+        "muscle_group_counts": load_muscle_group_counts(stats)
+    }
+
+
+def lock_users(session: Session, user_ids: List[int]):
+    """Hold off log writes for the given users until the transaction ends
+
+    Every log insert takes a key-share lock on its user row for the foreign key
+    check, which conflicts with FOR UPDATE: writes already in flight commit
+    before this returns and new ones wait, so a rebuild reads a settled set of
+    logs and no increment lands between its read and its write. SQLite ignores
+    FOR UPDATE; there the rebuilds delete first, which takes the database write lock.
+    """
+    session.exec(select(User.id).where(User.id.in_(user_ids)).with_for_update()).all()
+
+
+def rebuild_user_stats(session: Session, user_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """Replace the stored stats of the given users with values recomputed from their logs"""
+    lock_users(session, user_ids)
+    session.execute(delete(UserStats).where(UserStats.user_id.in_(user_ids)))
+
+    computed = compute_user_stats(session, user_ids)
+    for user_id, values in computed.items():
+        session.add(UserStats(
+            user_id=user_id,
+            total_workouts=values["total_workouts"],
+            total_seconds=values["total_seconds"],
+            total_minutes=values["total_minutes"],
+            first_workout_at=values["first_workout_at"],
+            muscle_group_counts=json.dumps(values["muscle_group_counts"])
+        ))
+    return computed
+
+
+def rebuild_daily_rollups(session: Session, user_ids: List[int]):
+    """Recompute the daily rollups of the given users from their workout logs"""
+    log_day = func.date(WorkoutLog.completed_at)
+    in_batch = WorkoutLog.user_id.in_(user_ids)
+
+    lock_users(session, user_ids)
+    session.execute(delete(DailyWorkoutRollup).where(DailyWorkoutRollup.user_id.in_(user_ids)))
+    session.execute(delete(DailyMuscleRollup).where(DailyMuscleRollup.user_id.in_(user_ids)))
+
+    session.execute(insert(DailyWorkoutRollup).from_select(
+        ["user_id", "day", "workouts_count", "total_duration"],
+        select(
+            WorkoutLog.user_id, log_day, func.count(WorkoutLog.id),
+            func.coalesce(func.sum(WorkoutLog.duration_completed), 0)
+        ).where(in_batch).group_by(WorkoutLog.user_id, log_day)
+    ))
+    session.execute(insert(DailyMuscleRollup).from_select(
+        ["user_id", "day", "muscle_group", "workouts_count"],
+        select(WorkoutLog.user_id, log_day, Exercise.target_muscle, func.count(WorkoutLog.id))
+        .join(Exercise)
+        .where(in_batch)
+        .group_by(WorkoutLog.user_id, log_day, Exercise.target_muscle)
+    ))
@@ -0,0 +1,142 @@
+import logging
+import os
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# "exact", "ivf", or "auto" (IVF once the catalog reaches IVF_MIN_SIZE exercises)
+SEARCH_BACKEND = os.getenv("EXERCISE_SEARCH_BACKEND", "auto")
+IVF_MIN_SIZE = int(os.getenv("EXERCISE_IVF_MIN_SIZE", "50000"))
+# Upper bound on the score matrix computed at once by batch_top_k (floats, ~256 MB)
+BATCH_SCORE_ELEMENTS = int(os.getenv("EXERCISE_BATCH_SCORE_ELEMENTS", str(1 << 26)))
+# Number of clusters (0 picks ~sqrt(n)) and clusters scanned per query; a higher
+# n_probe trades latency for recall
+IVF_LISTS = int(os.getenv("EXERCISE_IVF_LISTS", "0"))
+IVF_PROBE = int(os.getenv("EXERCISE_IVF_PROBE", "8"))
+
+SearchResult = Tuple[np.ndarray, np.ndarray]
+
+
+def top_k_indices(scores: np.ndarray, top_k: int) -> SearchResult:
+    """Indices and scores of the top_k highest scores, best first, in O(n + k log k)"""
+    top_k = min(top_k, len(scores))
+    if top_k <= 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+    if top_k < len(scores):
+        indices = np.argpartition(scores, len(scores) - top_k)[-top_k:]
+    else:
+        indices = np.arange(len(scores))
+    indices = indices[np.argsort(scores[indices])[::-1]]
+    return indices, scores[indices]
+
+
+def batch_top_k(matrix: np.ndarray, queries: np.ndarray, top_k: int,
+                masks: Sequence[Optional[np.ndarray]]) -> List[SearchResult]:
+    """Exact top_k rows of ``matrix`` for every query row, each under its own mask
+
+    Queries are scored in blocks with one matrix-matrix product per block,
+    sized so the score matrix stays under BATCH_SCORE_ELEMENTS.
+    """
+    results: List[SearchResult] = []
+    block = max(1, BATCH_SCORE_ELEMENTS // max(1, len(matrix)))
+    for start in range(0, len(queries), block):
+        scores = queries[start:start + block] @ matrix.T
+        for row, mask in zip(scores, masks[start:start + block]):
+            k = top_k
+            if mask is not None:
+                np.copyto(row, -np.inf, where=~mask)
+                k = min(top_k, int(mask.sum()))
+            results.append(top_k_indices(row, k))
+    return results
+
+
+class ExactSearch:
+    """Brute-force inner-product search over an L2-normalized matrix"""
+
+    name = "exact"
+
+    def __init__(self, matrix: np.ndarray):
+        self.matrix = matrix
+
+    def search(self, query: np.ndarray, top_k: int, mask: Optional[np.ndarray] = None) -> SearchResult:
+        scores = self.matrix @ query
+        if mask is not None:
+            scores = np.where(mask, scores, -np.inf)
+            top_k = min(top_k, int(mask.sum()))
+        return top_k_indices(scores, top_k)
+
+
+class IVFSearch:
+    """Inverted-file index: rows are clustered with spherical k-means and a query only
+    scores the rows of the ``n_probe`` clusters whose centroids are closest to it
+    """
+
+    name = "ivf"
+
+    def __init__(self, matrix: np.ndarray, n_lists: int = 0, n_probe: int = IVF_PROBE,
+                 train_iterations: int = 10, max_train_size: int = 100_000, seed: int = 0):
+        self.matrix = matrix
+        self.n_probe = n_probe
+        self._exact = ExactSearch(matrix)
+
+        n_rows = len(matrix)
+        self.n_lists = max(1, min(n_rows, n_lists or int(np.sqrt(n_rows))))
+        rng = np.random.default_rng(seed)
+
+        train_rows = rng.choice(n_rows, size=min(n_rows, max_train_size), replace=False)
+        self.centroids = self._train(matrix[train_rows], train_iterations, rng)
+
+        assignments = self._assign(matrix)
+        # Row ids grouped by cluster; cluster c owns ids[offsets[c]:offsets[c + 1]]
+        self.ids = np.argsort(assignments, kind="stable").astype(np.int64)
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(assignments, minlength=self.n_lists))])
+
+    def _train(self, sample: np.ndarray, iterations: int, rng: np.random.Generator) -> np.ndarray:
+        centroids = sample[rng.choice(len(sample), size=self.n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assignments = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+            norms = np.linalg.norm(sums, axis=1)
+            empty = norms == 0
+            # Re-seed empty clusters with random sample rows
+            sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()))]
+            norms[empty] = np.linalg.norm(sums[empty], axis=1)
+            centroids = sums / np.maximum(norms, 1e-12)[:, None]
+        return centroids.astype(np.float32)
+
+    def _assign(self, matrix: np.ndarray, chunk_size: int = 65536) -> np.ndarray:
+        assignments = np.empty(len(matrix), dtype=np.int64)
+        for start in range(0, len(matrix), chunk_size):
+            chunk = matrix[start:start + chunk_size]
+            assignments[start:start + chunk_size] = np.argmax(chunk @ self.centroids.T, axis=1)
+        return assignments
+
+    def search(self, query: np.ndarray, top_k: int, mask: Optional[np.ndarray] = None,
+               n_probe: Optional[int] = None) -> SearchResult:
+        n_probe = min(self.n_lists, n_probe or self.n_probe)
+        lists, _ = top_k_indices(self.centroids @ query, n_probe)
+        candidates = np.concatenate([self.ids[self.offsets[c]:self.offsets[c + 1]] for c in lists])
+        if mask is not None:
+            candidates = candidates[mask[candidates]]
+
+        if len(candidates) < top_k:
+            # Selective filters can leave the probed clusters nearly empty; answer exactly instead
+            return self._exact.search(query, top_k, mask)
+
+        local, scores = top_k_indices(self.matrix[candidates] @ query, top_k)
+        return candidates[local], scores
+
+
+def build_search(matrix: np.ndarray, backend: str = SEARCH_BACKEND):
+    """Create the similarity search structure configured for a catalog of this size"""
+    if backend == "auto":
+        backend = "ivf" if len(matrix) >= IVF_MIN_SIZE else "exact"
+    if backend == "ivf" and matrix.size:
+        return IVFSearch(matrix, n_lists=IVF_LISTS, n_probe=IVF_PROBE)
+    if backend not in ("exact", "ivf"):
+        logger.warning(f"Unknown EXERCISE_SEARCH_BACKEND {backend!r}, using exact search")
+    return ExactSearch(matrix)
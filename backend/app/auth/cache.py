@@ -0,0 +1,55 @@
+import os
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import event, inspect
+
+from app.cache import TTLCache
+from app.models import User
+
+# Verified tokens are cached until they expire (capped by this TTL); user
+# snapshots for at most AUTH_USER_CACHE_TTL seconds, which bounds how long a
+# change made by another worker process can go unnoticed
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "10000"))
+AUTH_TOKEN_CACHE_TTL = float(os.getenv("AUTH_TOKEN_CACHE_TTL", "300"))
+AUTH_USER_CACHE_SIZE = int(os.getenv("AUTH_USER_CACHE_SIZE", "10000"))
+AUTH_USER_CACHE_TTL = float(os.getenv("AUTH_USER_CACHE_TTL", "60"))
+
+
+@dataclass(frozen=True)
+class AuthenticatedUser:
+    """Lightweight, immutable snapshot of the user behind a request"""
+    id: int
+    email: str
+    full_name: str
+    is_active: bool
+    created_at: datetime
+
+    @classmethod
+    def from_user(cls, user: User) -> "AuthenticatedUser":
+        assert user.id is not None, "User must be persisted before it can be cached"
+        return cls(
+            id=user.id,
+            email=user.email,
+            full_name=user.full_name,
+            is_active=user.is_active,
+            created_at=user.created_at
+        )
+
+
+token_cache = TTLCache(AUTH_TOKEN_CACHE_SIZE, AUTH_TOKEN_CACHE_TTL)
+user_cache = TTLCache(AUTH_USER_CACHE_SIZE, AUTH_USER_CACHE_TTL)
+
+
+def invalidate_user(email: str):
+    """Drop the cached snapshot for a user so the next request reloads it"""
+    user_cache.pop(email)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_on_user_write(mapper, connection, target):
+    invalidate_user(target.email)
+    # Also drop the entry under the previous address when the email changed
+    for previous_email in inspect(target).attrs.email.history.deleted or ():
+        invalidate_user(previous_email)
@@ -1,18 +1,27 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
-from app.database import get_session
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.database import get_async_session
 from app.models import User
 from app.schemas import UserCreate, UserLogin, Token, UserResponse
-from app.auth.utils import get_password_hash, authenticate_user, create_access_token, get_current_user
+from app.auth.utils import hash_password_async, authenticate_user, create_access_token, get_current_user, remember_user
+from app.concurrency import PoolSaturatedError
 from datetime import timedelta
 
 router = APIRouter(prefix="/api/auth", tags=["authentication"])
 
+def auth_busy_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication service is busy, please retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
 @router.post("/register", response_model=UserResponse)
-async def register(user_data: UserCreate, session: Session = Depends(get_session)):
+async def register(user_data: UserCreate, session: AsyncSession = Depends(get_async_session)):
     # Check if user already exists
     statement = select(User).where(User.email == user_data.email)
-    existing_user = session.exec(statement).first()
+    existing_user = (await session.exec(statement)).first()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -20,15 +29,18 @@ async def register(user_data: UserCreate, session: Session = Depends(get_session
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    try:
+        hashed_password = await hash_password_async(user_data.password)
+    except PoolSaturatedError:
+        raise auth_busy_exception()
     user = User(
         email=user_data.email,
         hashed_password=hashed_password,
         full_name=user_data.full_name
     )
     session.add(user)
-    session.commit()
-    session.refresh(user)
+    await session.commit()
+    await session.refresh(user)
 
     # Add an assertion to ensure user.id is not None
     assert user.id is not None, "User ID should not be None after database refresh"
@@ -42,8 +54,11 @@ async def register(user_data: UserCreate, session: Session = Depends(get_session
     )
 
 @router.post("/login", response_model=Token)
-async def login(user_data: UserLogin, session: Session = Depends(get_session)):
-    user = authenticate_user(session, user_data.email, user_data.password)
+async def login(user_data: UserLogin, session: AsyncSession = Depends(get_async_session)):
+    try:
+        user = await authenticate_user(session, user_data.email, user_data.password)
+    except PoolSaturatedError:
+        raise auth_busy_exception()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -51,6 +66,9 @@ async def login(user_data: UserLogin, session: Session = Depends(get_session)):
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Warm the user cache so the client's first authenticated request needs no lookup
+    remember_user(user)
+    
     access_token_expires = timedelta(minutes=30)
     access_token = create_access_token(
         data={"sub": user.email}, expires_delta=access_token_expires
@@ -4,10 +4,14 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.models import User
-from app.database import get_session
+from app.database import get_async_session
+from app.concurrency import BoundedExecutor
+from app.auth.cache import AuthenticatedUser, token_cache, user_cache, AUTH_TOKEN_CACHE_TTL
 import os
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -16,7 +20,21 @@ SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes with any other cost factor are transparently re-hashed on the next successful login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# bcrypt is CPU bound and releases the GIL, so it runs on a small dedicated pool;
+# when AUTH_HASH_QUEUE requests are already waiting, new ones are rejected with 503
+AUTH_HASH_WORKERS = int(os.getenv("AUTH_HASH_WORKERS", "2"))
+AUTH_HASH_QUEUE = int(os.getenv("AUTH_HASH_QUEUE", "64"))
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS
+)
+auth_pool = BoundedExecutor("auth", AUTH_HASH_WORKERS, AUTH_HASH_QUEUE)
 security = HTTPBearer()
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -25,6 +43,10 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+async def hash_password_async(password: str) -> str:
+    """Hash a password on the auth pool without blocking the event loop"""
+    return await auth_pool.run(get_password_hash, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -36,6 +58,11 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 def verify_token(token: str) -> Optional[str]:
+    # Signatures are only verified once per token while it stays cached
+    cached_email = token_cache.get(token)
+    if cached_email is not None:
+        return cached_email
+    
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         
@@ -45,16 +72,28 @@ def verify_token(token: str) -> Optional[str]:
         # Check if the claim is present and is a string
         if email_claim is None or not isinstance(email_claim, str):
             return None
+        
+        # Never cache a token beyond its own expiry (exp is seconds since the epoch, in UTC)
+        exp = payload.get("exp")
+        expires_in = exp - time.time() if isinstance(exp, (int, float)) else 0
+        if expires_in > 0:
+            token_cache.set(token, email_claim, ttl=min(expires_in, AUTH_TOKEN_CACHE_TTL))
             
         return email_claim
         
     except JWTError:
         return None
 
+def remember_user(user: User) -> AuthenticatedUser:
+    """Cache a snapshot of a freshly loaded user"""
+    snapshot = AuthenticatedUser.from_user(user)
+    user_cache.set(user.email, snapshot)
+    return snapshot
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    session: Session = Depends(get_session)
-) -> User:
+    session: AsyncSession = Depends(get_async_session)
+) -> AuthenticatedUser:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -65,17 +104,32 @@ async def get_current_user(
     if email is None:
         raise credentials_exception
     
-    statement = select(User).where(User.email == email)
-    user = session.exec(statement).first()
+    user = user_cache.get(email)
     if user is None:
+        statement = select(User).where(User.email == email)
+        db_user = (await session.exec(statement)).first()
+        if db_user is None:
+            raise credentials_exception
+        user = remember_user(db_user)
+    
+    if not user.is_active:
         raise credentials_exception
     return user
 
-def authenticate_user(session: Session, email: str, password: str) -> Optional[User]:
+async def authenticate_user(session: AsyncSession, email: str, password: str) -> Optional[User]:
     statement = select(User).where(User.email == email)
-    user = session.exec(statement).first()
+    user = (await session.exec(statement)).first()
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    
+    valid, new_hash = await auth_pool.run(pwd_context.verify_and_update, password, user.hashed_password)
+    if not valid:
         return None
+    
+    # The stored hash used an outdated cost factor; replace it now that we know the password
+    if new_hash:
+        user.hashed_password = new_hash
+        session.add(user)
+        await session.commit()
+        await session.refresh(user)
     return user
\ No newline at end of file
@@ -0,0 +1,76 @@
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+# Bitmaps are packed into 64-bit words: row i is bit (i % 64) of word i // 64
+WORD_BITS = 64
+# Set bits per byte value, for popcounts that also work on numpy 1.x
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _words(n_rows: int) -> int:
+    return (n_rows + WORD_BITS - 1) // WORD_BITS
+
+
+def pack(mask: np.ndarray) -> np.ndarray:
+    """Pack a boolean row mask into a uint64 bitmap"""
+    padded = np.zeros(_words(len(mask)) * WORD_BITS, dtype=bool)
+    padded[:len(mask)] = mask
+    return np.packbits(padded, bitorder="little").view(np.uint64)
+
+
+def unpack(bitmap: np.ndarray, n_rows: int) -> np.ndarray:
+    """Expand a uint64 bitmap back into a boolean row mask"""
+    return np.unpackbits(bitmap.view(np.uint8), count=n_rows, bitorder="little").view(bool)
+
+
+def count(bitmap: np.ndarray) -> int:
+    """Number of rows set in a bitmap"""
+    if hasattr(np, "bitwise_count"):
+        return int(np.bitwise_count(bitmap).sum(dtype=np.int64))
+    return int(_POPCOUNT[bitmap.view(np.uint8)].sum(dtype=np.int64))
+
+
+class AttributeBitmapIndex:
+    """One packed bitmap per distinct (lowercased) value of a categorical column
+
+    OR-ing the bitmaps of a few values touches n / 64 words each, so building a
+    candidate set over a million rows costs microseconds rather than a pass
+    over Python objects.
+    """
+
+    def __init__(self, values: Iterable[str]):
+        # Dictionary-encode the column, then build each value's bitmap from the codes
+        vocabulary: Dict[str, int] = {}
+        codes = np.fromiter((vocabulary.setdefault(str(v).lower(), len(vocabulary)) for v in values), dtype=np.int32)
+        self.n_rows = len(codes)
+        self.bitmaps: Dict[str, np.ndarray] = {value: pack(codes == code) for value, code in vocabulary.items()}
+        self._empty = np.zeros(_words(self.n_rows), dtype=np.uint64)
+
+    def all(self) -> np.ndarray:
+        return pack(np.ones(self.n_rows, dtype=bool))
+
+    def none(self) -> np.ndarray:
+        return self._empty.copy()
+
+    def any_of(self, values: Iterable[str]) -> np.ndarray:
+        """Bitmap of rows whose value is any of ``values``; unknown values match nothing"""
+        result = self.none()
+        for value in {str(v).lower() for v in values}:
+            bitmap = self.bitmaps.get(value)
+            if bitmap is not None:
+                np.bitwise_or(result, bitmap, out=result)
+        return result
+
+    def values(self):
+        return sorted(self.bitmaps)
+
+
+def intersect(*bitmaps: Optional[np.ndarray]) -> Optional[np.ndarray]:
+    """AND of the given bitmaps, skipping None (no constraint); None if all are None"""
+    result = None
+    for bitmap in bitmaps:
+        if bitmap is None:
+            continue
+        result = bitmap.copy() if result is None else np.bitwise_and(result, bitmap, out=result)
+    return result
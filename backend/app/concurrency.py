@@ -0,0 +1,70 @@
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from app.metrics import registry
+
+
+class PoolSaturatedError(Exception):
+    """Raised when a bounded executor already has its maximum amount of work queued"""
+
+
+class BoundedExecutor:
+    """Thread pool for blocking work called from async handlers, with a cap on queued work
+
+    At most ``max_workers`` calls run at once and at most ``max_queue`` more
+    wait for a thread; further calls are rejected immediately with
+    PoolSaturatedError so callers can shed load instead of piling up.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.rejected = 0
+
+        registry.gauge(
+            "executor_in_flight", "Calls running or queued on a bounded executor", ["pool"]
+        ).set_function(lambda: self._pending, pool=name)
+        registry.counter(
+            "executor_rejected", "Calls rejected because a bounded executor was saturated", ["pool"]
+        ).set_function(lambda: self.rejected, pool=name)
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run ``fn`` on the pool and await its result without blocking the event loop"""
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise PoolSaturatedError(f"{self.name} pool is saturated")
+            self._pending += 1
+
+        # Carry context variables (e.g. per-request timers) into the worker thread
+        context = contextvars.copy_context()
+        try:
+            future = self._executor.submit(context.run, fn, *args, **kwargs)
+        except BaseException:
+            self._release()
+            raise
+        # Also fires when a queued call is cancelled (client gone, request timed
+        # out) and never runs, so its slot is always given back
+        future.add_done_callback(lambda f: self._release())
+        return await asyncio.wrap_future(future)
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            pending = self._pending
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": pending,
+            "rejected": self.rejected
+        }
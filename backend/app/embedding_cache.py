@@ -0,0 +1,130 @@
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import numpy as np
+
+from app.vectors import encode_vector, decode_vector
+
+logger = logging.getLogger(__name__)
+
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "4096"))
+# Set to an empty string to disable the on-disk tier
+QUERY_CACHE_PATH = os.getenv("QUERY_EMBEDDING_CACHE_PATH", ".cache/query_embeddings.sqlite3")
+
+
+class QueryEmbeddingCache:
+    """Two-tier cache of query embeddings: a bounded in-process LRU backed by a shared SQLite file"""
+
+    def __init__(self, model_name: str, max_size: int = QUERY_CACHE_SIZE, path: Optional[str] = QUERY_CACHE_PATH):
+        self.model_name = model_name
+        self.max_size = max_size
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self._disk: Optional[sqlite3.Connection] = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if path:
+            self._open_disk(path)
+
+    def _open_disk(self, path: str):
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Shared by all workers; WAL lets readers proceed while another process writes
+            self._disk = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+            self._disk.execute("PRAGMA journal_mode=WAL")
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS query_embedding ("
+                "model TEXT NOT NULL, query TEXT NOT NULL, vector BLOB NOT NULL, "
+                "PRIMARY KEY (model, query))"
+            )
+        except sqlite3.Error as e:
+            logger.error(f"Failed to open query embedding cache at {path}: {e}")
+            self._disk = None
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Canonical cache key for a query string"""
+        return " ".join(query.lower().split())
+
+    def get(self, query: str) -> Optional[np.ndarray]:
+        key = self.normalize(query)
+
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return vector
+
+        vector = self._read_disk(key)
+        with self._lock:
+            if vector is not None:
+                self.disk_hits += 1
+                self._remember(key, vector)
+            else:
+                self.misses += 1
+        return vector
+
+    def put(self, query: str, vector: np.ndarray):
+        key = self.normalize(query)
+        vector = np.array(vector, dtype=np.float32)
+        vector.flags.writeable = False
+
+        with self._lock:
+            self._remember(key, vector)
+        self._write_disk(key, vector)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._memory),
+                "max_size": self.max_size,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses
+            }
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+
+    def _remember(self, key: str, vector: np.ndarray):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_size:
+            self._memory.popitem(last=False)
+
+    def _read_disk(self, key: str) -> Optional[np.ndarray]:
+        if self._disk is None:
+            return None
+        try:
+            with self._disk_lock:
+                row = self._disk.execute(
+                    "SELECT vector FROM query_embedding WHERE model = ? AND query = ?",
+                    (self.model_name, key)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Query embedding cache read failed: {e}")
+            return None
+        return decode_vector(row[0]) if row else None
+
+    def _write_disk(self, key: str, vector: np.ndarray):
+        if self._disk is None:
+            return
+        try:
+            with self._disk_lock:
+                self._disk.execute(
+                    "INSERT OR REPLACE INTO query_embedding (model, query, vector) VALUES (?, ?, ?)",
+                    (self.model_name, key, encode_vector(vector))
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Query embedding cache write failed: {e}")
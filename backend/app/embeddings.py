@@ -1,24 +1,84 @@
-from sentence_transformers import SentenceTransformer
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
 import json
-from typing import List, Dict, Any
+import os
+import threading
+import time
+from enum import Enum
+from typing import List, Dict, Any, Optional
 import logging
+from app.embedding_cache import QueryEmbeddingCache
+from app.ann import top_k_indices
+from app.metrics import registry
+from app.profiling import stage
 
 logger = logging.getLogger(__name__)
 
+# Stored exercise embeddings are tagged with this name so vectors from a
+# different model are never mixed into the same similarity search
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+
+ENCODE_SECONDS = registry.histogram(
+    "embedding_encode_seconds", "Time spent in model forward passes", ["kind"]
+)
+ENCODED_TEXTS = registry.counter(
+    "embedding_texts_encoded", "Texts run through the embedding model", ["kind"]
+)
+QUERY_CACHE_LOOKUPS = registry.counter(
+    "embedding_query_cache_lookups", "Query embedding cache lookups by outcome", ["outcome"]
+)
+
 class EmbeddingService:
     def __init__(self):
-        self.model = None
-        self._load_model()
+        self._model = None
+        self._model_lock = threading.Lock()
+        self.model_state = "not_loaded"  # not_loaded -> loading -> ready | failed
+        self.model_load_seconds: Optional[float] = None
+        self.query_cache = QueryEmbeddingCache(EMBEDDING_MODEL_NAME)
+        for outcome in ("memory_hits", "disk_hits", "misses"):
+            QUERY_CACHE_LOOKUPS.set_function(lambda outcome=outcome: self.query_cache.stats()[outcome], outcome=outcome)
+    
+    @property
+    def model(self):
+        """The SentenceTransformer model, loaded on first use"""
+        if self._model is None and self.model_state != "failed":
+            self._load_model()
+        return self._model
+    
+    @property
+    def is_ready(self) -> bool:
+        return self.model_state == "ready"
     
     def _load_model(self):
-        try:
-            self.model = SentenceTransformer('all-MiniLM-L6-v2')
-            logger.info("SentenceTransformer model loaded successfully")
-        except Exception as e:
-            logger.error(f"Failed to load SentenceTransformer model: {e}")
-            self.model = None
+        with self._model_lock:
+            if self._model is not None or self.model_state == "failed":
+                return
+            
+            self.model_state = "loading"
+            started = time.perf_counter()
+            try:
+                # Imported here so importing the app does not pay for torch and transformers
+                from sentence_transformers import SentenceTransformer
+                self._model = SentenceTransformer(EMBEDDING_MODEL_NAME)
+                self.model_state = "ready"
+                self.model_load_seconds = time.perf_counter() - started
+                logger.info(f"SentenceTransformer model loaded successfully in {self.model_load_seconds:.2f}s")
+            except Exception as e:
+                logger.error(f"Failed to load SentenceTransformer model: {e}")
+                self._model = None
+                self.model_state = "failed"
+    
+    def warm_up(self):
+        """Load the model and run one forward pass so the first request is not slow"""
+        if self.model is not None:
+            self.create_embedding("warm up")
+    
+    def status(self) -> Dict[str, Any]:
+        return {
+            "name": EMBEDDING_MODEL_NAME,
+            "state": self.model_state,
+            "load_seconds": self.model_load_seconds,
+            "query_cache": self.query_cache.stats()
+        }
     
     def create_embedding(self, text: str) -> List[float]:
         if not self.model:
@@ -26,16 +86,71 @@ class EmbeddingService:
             return []
         
         try:
-            embedding = self.model.encode(text)
+            with stage("embedding.encode"), ENCODE_SECONDS.time(kind="single"):
+                embedding = self.model.encode(text)
+            ENCODED_TEXTS.inc(kind="single")
             return embedding.tolist()
         except Exception as e:
             logger.error(f"Failed to create embedding: {e}")
             return []
     
+    def create_query_embedding(self, query: str) -> np.ndarray:
+        """Create an embedding for a preference query, reusing cached vectors when possible"""
+        with stage("embedding.cache_lookup"):
+            cached = self.query_cache.get(query)
+        if cached is not None:
+            return cached
+        
+        embedding = self.create_embedding(self.query_cache.normalize(query))
+        if not embedding:
+            return np.zeros(0, dtype=np.float32)
+        
+        vector = np.asarray(embedding, dtype=np.float32)
+        self.query_cache.put(query, vector)
+        return vector
+    
+    def create_query_embeddings(self, queries: List[str], batch_size: int = 64) -> List[np.ndarray]:
+        """Embeddings for many preference queries: cached vectors plus one batched encode for the rest"""
+        vectors: List[Optional[np.ndarray]] = []
+        with stage("embedding.cache_lookup"):
+            for query in queries:
+                vectors.append(self.query_cache.get(query))
+        
+        missing = sorted({query for query, vector in zip(queries, vectors) if vector is None})
+        if missing:
+            with stage("embedding.encode"):
+                encoded = self.create_embeddings([self.query_cache.normalize(q) for q in missing], batch_size)
+            if len(encoded) == len(missing):
+                fresh = dict(zip(missing, encoded))
+                for query, vector in fresh.items():
+                    self.query_cache.put(query, vector)
+                vectors = [fresh[query] if vector is None else vector for query, vector in zip(queries, vectors)]
+        
+        return [np.zeros(0, dtype=np.float32) if vector is None else vector for vector in vectors]
+    
+    def create_embeddings(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        """Create embeddings for many texts using batched forward passes"""
+        if not self.model:
+            logger.warning("Model not loaded, returning empty embeddings")
+            return np.zeros((0, 0), dtype=np.float32)
+        
+        try:
+            with ENCODE_SECONDS.time(kind="batch"):
+                embeddings = self.model.encode(texts, batch_size=batch_size, show_progress_bar=False)
+            ENCODED_TEXTS.inc(len(texts), kind="batch")
+            return np.asarray(embeddings, dtype=np.float32)
+        except Exception as e:
+            logger.error(f"Failed to create embeddings: {e}")
+            return np.zeros((0, 0), dtype=np.float32)
+    
+    @staticmethod
+    def exercise_text(exercise: Dict[str, Any]) -> str:
+        """Text that represents an exercise in embedding space"""
+        return f"{exercise['name']} {exercise['target_muscle']} {exercise['equipment']} {exercise['description']}"
+    
     def create_exercise_embedding(self, exercise: Dict[str, Any]) -> List[float]:
         """Create embedding for an exercise based on its attributes"""
-        text = f"{exercise['name']} {exercise['target_muscle']} {exercise['equipment']} {exercise['description']}"
-        return self.create_embedding(text)
+        return self.create_embedding(self.exercise_text(exercise))
     
     def find_similar_exercises(self, query_embedding: List[float], exercise_embeddings: List[Dict], top_k: int = 10) -> List[Dict]:
         """Find exercises similar to the query embedding"""
@@ -43,13 +158,14 @@ class EmbeddingService:
             return []
         
         try:
-            query_vec = np.array(query_embedding).reshape(1, -1)
-            exercise_vecs = np.array([ex['embedding'] for ex in exercise_embeddings])
+            query_vec = np.asarray(query_embedding, dtype=np.float32)
+            exercise_vecs = np.array([ex['embedding'] for ex in exercise_embeddings], dtype=np.float32)
             
-            similarities = cosine_similarity(query_vec, exercise_vecs)[0]
+            norms = np.linalg.norm(exercise_vecs, axis=1) * np.linalg.norm(query_vec)
+            similarities = (exercise_vecs @ query_vec) / np.where(norms == 0, 1, norms)
             
-            # Get top_k most similar exercises
-            top_indices = np.argsort(similarities)[::-1][:top_k]
+            # Get top_k most similar exercises without sorting the whole candidate list
+            top_indices, _ = top_k_indices(similarities, top_k)
             
             similar_exercises = []
             for idx in top_indices:
@@ -64,13 +180,18 @@ class EmbeddingService:
     
     def create_query_from_preferences(self, preferences: Dict[str, Any]) -> str:
         """Create a query string from user preferences"""
-        focus_areas = " ".join(preferences.get('focus_areas', []))
-        equipment = " ".join(preferences.get('available_equipment', []))
-        workout_type = preferences.get('workout_type', '')
-        user_level = preferences.get('user_level', '')
+        # Sort and de-duplicate so equivalent preferences map to the same cached embedding
+        focus_areas = " ".join(sorted({area.lower() for area in preferences.get('focus_areas', [])}))
+        equipment = " ".join(sorted({eq.lower() for eq in preferences.get('available_equipment', [])}))
+        workout_type = self.preference_value(preferences.get('workout_type', ''))
+        user_level = self.preference_value(preferences.get('user_level', ''))
         
         query = f"{focus_areas} {equipment} {workout_type} {user_level} exercise workout"
-        return query.strip()
+        return " ".join(query.split())
+    
+    @staticmethod
+    def preference_value(value: Any) -> str:
+        return value.value if isinstance(value, Enum) else str(value)
 
 # Global instance
 embedding_service = EmbeddingService()
\ No newline at end of file
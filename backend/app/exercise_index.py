@@ -0,0 +1,323 @@
+import hashlib
+import itertools
+import logging
+import os
+import threading
+import time
+from itertools import chain
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import event, func, insert, update
+from sqlalchemy.orm import Session as OrmSession
+from sqlmodel import Session, select
+
+from app.aggregates import dialect_insert
+from app.models import CatalogVersion, Exercise
+from app.embeddings import EMBEDDING_MODEL_NAME
+from app.vectors import VECTOR_DTYPE, decode_matrix
+from app.ann import batch_top_k, build_search
+from app.bitmaps import AttributeBitmapIndex, intersect, unpack
+from app.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# How often (in seconds) to compare the catalog stamp against the database.
+# Writes made through this process invalidate the index immediately; the
+# periodic check picks up writes from other processes such as seed_database.py.
+CATALOG_CHECK_INTERVAL = float(os.getenv("EXERCISE_INDEX_CHECK_SECONDS", "30"))
+
+BUILD_SECONDS = registry.histogram(
+    "exercise_index_build_seconds", "Time to rebuild the exercise index from the database",
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0)
+)
+
+
+class IndexSnapshot:
+    """Immutable view of the exercise catalog used to serve plan requests"""
+
+    def __init__(self, records: List[Dict[str, Any]], matrix: np.ndarray, has_embedding: np.ndarray, version: int):
+        self.records = records
+        self.matrix = matrix
+        self.has_embedding = has_embedding
+        self.version = version
+        self.search_backend = build_search(matrix)
+        self.ids = np.array([r['id'] for r in records], dtype=np.int64)
+        self.equipment = AttributeBitmapIndex(r['equipment'] for r in records)
+        self.target_muscle = AttributeBitmapIndex(r['target_muscle'] for r in records)
+        self.difficulty = AttributeBitmapIndex(r['difficulty'] for r in records)
+        self.fingerprint = self._fingerprint()
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def dimension(self) -> int:
+        return self.matrix.shape[1]
+
+    def _fingerprint(self) -> str:
+        """Stable digest of the catalog contents, identical across processes and rebuilds"""
+        digest = hashlib.blake2b(EMBEDDING_MODEL_NAME.encode(), digest_size=16)
+        for r in self.records:
+            digest.update(repr((
+                r['id'], r['name'], r['description'], r['target_muscle'], r['equipment'], r['difficulty']
+            )).encode())
+        digest.update(np.packbits(self.has_embedding).tobytes())
+        # Re-embedding in place changes the ranking without touching any other column
+        digest.update(np.ascontiguousarray(self.matrix).tobytes())
+        return digest.hexdigest()
+
+    def filter_bitmap(self, equipment: Optional[List[str]] = None, target_muscles: Optional[List[str]] = None,
+                      difficulties: Optional[List[str]] = None) -> np.ndarray:
+        """Bitmap of exercises matching every given filter, each filter matching any of its values
+
+        A filter that is None is not applied; an empty list matches nothing.
+        """
+        bitmap = intersect(
+            None if equipment is None else self.equipment.any_of(equipment),
+            None if target_muscles is None else self.target_muscle.any_of(target_muscles),
+            None if difficulties is None else self.difficulty.any_of(difficulties)
+        )
+        return self.equipment.all() if bitmap is None else bitmap
+
+    def to_mask(self, bitmap: np.ndarray) -> np.ndarray:
+        """Boolean row mask for a filter bitmap, as used by search"""
+        return unpack(bitmap, len(self.records))
+
+    def equipment_mask(self, equipment: List[str]) -> np.ndarray:
+        """Boolean mask of exercises usable with the given equipment"""
+        return self.to_mask(self.equipment.any_of(equipment))
+
+    def search(self, query_embedding: np.ndarray, top_k: int, mask: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+        """Rank exercises by cosine similarity using the configured exact or approximate search"""
+        if not len(self.records) or query_embedding is None or not len(query_embedding):
+            return []
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        if query.shape != (self.dimension,):
+            logger.warning(f"Query embedding has shape {query.shape}, index expects ({self.dimension},)")
+            return []
+
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return []
+        query = query / norm
+
+        candidates = self.has_embedding if mask is None else (mask & self.has_embedding)
+        if not candidates.any():
+            return []
+
+        indices, scores = self.search_backend.search(query, top_k, candidates)
+        return [(int(idx), float(score)) for idx, score in zip(indices, scores)]
+
+
+    def search_batch(self, query_embeddings: List[np.ndarray], top_k: int,
+                     masks: List[Optional[np.ndarray]]) -> List[List[Tuple[int, float]]]:
+        """Similarity ranking for many queries at once, one mask per query
+
+        Uses the same backend as ``search``, so a batch returns exactly what the
+        queries would one by one; bulk and single plans share the plan cache.
+        Queries that are empty, zero or of the wrong dimension get no results.
+        """
+        results: List[List[Tuple[int, float]]] = [[] for _ in query_embeddings]
+        if not len(self.records) or not self.has_embedding.any():
+            return results
+
+        rows, queries, query_masks = [], [], []
+        for row, (embedding, mask) in enumerate(zip(query_embeddings, masks)):
+            query = np.asarray(embedding, dtype=np.float32)
+            if query.shape != (self.dimension,) or not np.linalg.norm(query):
+                continue
+            candidates = self.has_embedding if mask is None else (mask & self.has_embedding)
+            if candidates.any():
+                rows.append(row)
+                queries.append(query / np.linalg.norm(query))
+                query_masks.append(candidates)
+
+        if rows:
+            if self.search_backend.name == "exact":
+                ranked = batch_top_k(self.matrix, np.stack(queries), top_k, query_masks)
+            else:
+                ranked = [self.search_backend.search(query, top_k, mask) for query, mask in zip(queries, query_masks)]
+            for row, (indices, scores) in zip(rows, ranked):
+                results[row] = [(int(idx), float(score)) for idx, score in zip(indices, scores)]
+        return results
+
+
+class ExerciseIndex:
+    """Process-wide in-memory index of exercises and their L2-normalized embeddings"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot: Optional[IndexSnapshot] = None
+        self._stamp: Optional[Tuple[int, int, int]] = None
+        # invalidate() moves to a new generation; the snapshot is fresh only once
+        # a build that started at (or after) that generation has finished
+        self._generations = itertools.count(1)
+        self._generation = 0
+        self._built_generation: Optional[int] = None
+        self._last_check = 0.0
+        self._version = 0
+
+    @property
+    def is_built(self) -> bool:
+        return self._snapshot is not None
+
+    def status(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        if snapshot is None:
+            return {"built": False}
+        return {
+            "built": True,
+            "version": snapshot.version,
+            "fingerprint": snapshot.fingerprint,
+            "exercises": len(snapshot),
+            "search_backend": snapshot.search_backend.name,
+            "with_embeddings": int(snapshot.has_embedding.sum())
+        }
+
+    def invalidate(self):
+        """Mark the index as stale so the next read rebuilds it"""
+        self._generation = next(self._generations)
+
+    def current(self) -> Optional[IndexSnapshot]:
+        """The snapshot if it is known to be fresh without touching the database, else None"""
+        snapshot = self._snapshot
+        if snapshot is None or self._is_stale() or time.monotonic() - self._last_check >= CATALOG_CHECK_INTERVAL:
+            return None
+        return snapshot
+
+    def get(self, session: Session) -> IndexSnapshot:
+        """Return the current snapshot, rebuilding it if the catalog changed"""
+        snapshot = self._snapshot
+        if snapshot is None or self._is_stale() or self._catalog_changed(session):
+            snapshot = self.refresh(session)
+        return snapshot
+
+    def refresh(self, session: Session) -> IndexSnapshot:
+        """Rebuild the index from the database"""
+        with self._lock:
+            # Read the generation before the catalog, so an invalidation during
+            # the build leaves the index stale and the next read rebuilds again
+            generation = self._generation
+            stamp = self._read_stamp(session)
+            # Another thread may have rebuilt the index while we waited for the lock
+            if self._snapshot is not None and self._built_generation == generation and stamp == self._stamp:
+                return self._snapshot
+
+            with BUILD_SECONDS.time():
+                snapshot = self._build(session)
+            self._snapshot = snapshot
+            self._stamp = stamp
+            self._built_generation = generation
+            self._last_check = time.monotonic()
+            logger.info(f"Exercise index built with {len(snapshot)} exercises (version {snapshot.version})")
+            return snapshot
+
+    def _is_stale(self) -> bool:
+        return self._built_generation != self._generation
+
+    def _catalog_changed(self, session: Session) -> bool:
+        now = time.monotonic()
+        if now - self._last_check < CATALOG_CHECK_INTERVAL:
+            return False
+        self._last_check = now
+        return self._read_stamp(session) != self._stamp
+
+    def _read_stamp(self, session: Session) -> Tuple[int, int, int]:
+        # count and max id catch inserts and deletes; the catalog version also catches updates in place
+        catalog_version = select(CatalogVersion.version).where(CatalogVersion.id == 1).scalar_subquery()
+        count, max_id, version = session.exec(
+            select(func.count(Exercise.id), func.max(Exercise.id), catalog_version)
+        ).one()
+        return (count or 0, max_id or 0, version or 0)
+
+    def _build(self, session: Session) -> IndexSnapshot:
+        statement = select(
+            Exercise.id, Exercise.name, Exercise.description, Exercise.target_muscle,
+            Exercise.equipment, Exercise.difficulty, Exercise.instructions,
+            Exercise.embedding, Exercise.embedding_model
+        ).order_by(Exercise.id)
+        rows = session.exec(statement).all()
+
+        records = []
+        blobs = []
+        rows_with_embedding = []
+        dimension = 0
+        for row_idx, row in enumerate(rows):
+            records.append({
+                "id": row.id,
+                "name": row.name,
+                "description": row.description,
+                "target_muscle": row.target_muscle,
+                "equipment": row.equipment,
+                "difficulty": row.difficulty,
+                "instructions": row.instructions
+            })
+
+            if not row.embedding or row.embedding_model != EMBEDDING_MODEL_NAME:
+                continue
+            if not dimension:
+                dimension = len(row.embedding) // VECTOR_DTYPE.itemsize
+            if len(row.embedding) != dimension * VECTOR_DTYPE.itemsize:
+                logger.warning(f"Exercise {row.id} has an embedding of unexpected size, skipping it in similarity search")
+                continue
+            blobs.append(row.embedding)
+            rows_with_embedding.append(row_idx)
+
+        skipped = sum(1 for row in rows if row.embedding and row.embedding_model != EMBEDDING_MODEL_NAME)
+        if skipped:
+            logger.warning(f"{skipped} exercises have embeddings from a different model than {EMBEDDING_MODEL_NAME}; re-embed them")
+
+        matrix = np.zeros((len(records), dimension), dtype=np.float32)
+        has_embedding = np.zeros(len(records), dtype=bool)
+        if blobs:
+            matrix[rows_with_embedding] = decode_matrix(blobs, dimension)
+            has_embedding[rows_with_embedding] = True
+
+        norms = np.linalg.norm(matrix, axis=1)
+        has_embedding &= norms > 0
+        matrix[has_embedding] /= norms[has_embedding, None]
+
+        self._version += 1
+        return IndexSnapshot(records, np.ascontiguousarray(matrix), has_embedding, self._version)
+
+
+# Global instance
+exercise_index = ExerciseIndex()
+registry.gauge("exercise_index_exercises", "Exercises in the current index snapshot").set_function(
+    lambda: exercise_index.status().get("exercises", 0)
+)
+
+
+def bump_catalog_version(connection):
+    """Record a catalog write for other processes; run it in the writing transaction"""
+    # Databases made by create_all have no row yet; the upsert lets concurrent
+    # first writers create it without a duplicate key error
+    statement = dialect_insert(connection, CatalogVersion)
+    if statement is not None:
+        connection.execute(statement.values(id=1, version=1).on_conflict_do_update(
+            index_elements=["id"], set_={"version": CatalogVersion.version + 1}
+        ))
+        return
+
+    result = connection.execute(
+        update(CatalogVersion).where(CatalogVersion.id == 1).values(version=CatalogVersion.version + 1)
+    )
+    if result.rowcount == 0:
+        connection.execute(insert(CatalogVersion).values(id=1, version=1))
+
+
+@event.listens_for(OrmSession, "after_flush")
+def _bump_on_catalog_flush(session, flush_context):
+    # new / dirty / deleted still describe what this flush wrote
+    changed = chain(session.new, session.deleted, (obj for obj in session.dirty if session.is_modified(obj)))
+    if any(isinstance(obj, Exercise) for obj in changed):
+        bump_catalog_version(session.connection())
+
+
+@event.listens_for(Exercise, "after_insert")
+@event.listens_for(Exercise, "after_update")
+@event.listens_for(Exercise, "after_delete")
+def _invalidate_on_catalog_write(mapper, connection, target):
+    exercise_index.invalidate()
@@ -0,0 +1,158 @@
+import csv
+import json
+import logging
+import os
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import insert, update
+from sqlmodel import Session, select
+
+from app.aggregates import dialect_insert
+from app.embeddings import embedding_service, EMBEDDING_MODEL_NAME
+from app.exercise_index import bump_catalog_version, exercise_index
+from app.models import Exercise
+from app.vectors import encode_vector
+
+logger = logging.getLogger(__name__)
+
+EXERCISE_FIELDS = ("name", "description", "target_muscle", "equipment", "difficulty", "instructions")
+
+DEFAULT_ENCODE_BATCH_SIZE = 128
+DEFAULT_CHUNK_SIZE = 1000
+
+
+class EmbeddingFailedError(Exception):
+    """Raised when the embedding model is loaded but fails to encode a chunk"""
+
+
+def read_exercise_file(path: str) -> Iterator[Dict[str, Any]]:
+    """Stream exercise records from a CSV or JSONL file without loading it into memory"""
+    extension = os.path.splitext(path)[1].lower()
+
+    with open(path, newline="", encoding="utf-8") as f:
+        if extension == ".csv":
+            for row in csv.DictReader(f):
+                yield row
+        elif extension in (".jsonl", ".ndjson"):
+            for line_number, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    logger.warning(f"{path}:{line_number}: skipping invalid JSON ({e})")
+                    yield {}
+        else:
+            raise ValueError(f"Unsupported exercise file format: {extension} (expected .csv or .jsonl)")
+
+
+def _clean_record(record: Dict[str, Any]) -> Optional[Dict[str, str]]:
+    cleaned = {}
+    for field in EXERCISE_FIELDS:
+        value = record.get(field)
+        if value is None or not str(value).strip():
+            return None
+        cleaned[field] = str(value).strip()
+    return cleaned
+
+
+def _chunks(records: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    iterator = iter(records)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def upsert_exercise_chunk(session: Session, chunk: List[Dict[str, str]], batch_size: int = DEFAULT_ENCODE_BATCH_SIZE) -> Dict[str, int]:
+    """Embed a chunk of exercises in batches and insert or update them by name in one transaction"""
+    # Later records win when the same exercise name appears twice in a chunk
+    by_name = {record["name"]: record for record in chunk}
+    records = list(by_name.values())
+
+    embeddings = embedding_service.create_embeddings(
+        [embedding_service.exercise_text(record) for record in records], batch_size=batch_size
+    )
+    if len(embeddings) == len(records):
+        rows = [
+            {**record, "embedding": encode_vector(embedding), "embedding_model": EMBEDDING_MODEL_NAME}
+            for record, embedding in zip(records, embeddings)
+        ]
+    elif embedding_service.model_state == "ready":
+        # The model is there but encoding failed: abort before anything is written,
+        # so the checkpoint stays put and a resume retries this chunk
+        raise EmbeddingFailedError(f"Failed to embed a chunk of {len(records)} exercises")
+    else:
+        # Without a model, new exercises are stored without vectors; the rows carry
+        # no embedding columns, so updates leave existing vectors untouched
+        logger.warning("Embedding model unavailable, storing exercises without embeddings")
+        rows = [dict(record) for record in records]
+
+    existing = dict(session.exec(
+        select(Exercise.name, Exercise.id).where(Exercise.name.in_(list(by_name)))
+    ).all())
+    updated = sum(1 for row in rows if row["name"] in existing)
+
+    statement = dialect_insert(session, Exercise)
+    if statement is not None:
+        # Upsert on the unique name index, so concurrent ingests cannot insert a name twice
+        statement = statement.on_conflict_do_update(
+            index_elements=["name"],
+            set_={column: statement.excluded[column] for column in rows[0] if column != "name"}
+        )
+        session.execute(statement, rows)
+    else:
+        new_rows = [row for row in rows if row["name"] not in existing]
+        updated_rows = [{**row, "id": existing[row["name"]]} for row in rows if row["name"] in existing]
+        if new_rows:
+            session.execute(insert(Exercise), new_rows)
+        if updated_rows:
+            session.execute(update(Exercise), updated_rows)
+    # Bulk statements bypass ORM events, so signal the change to other processes
+    # and invalidate the in-process index explicitly
+    bump_catalog_version(session.connection())
+    session.commit()
+    exercise_index.invalidate()
+    return {"inserted": len(rows) - updated, "updated": updated}
+
+
+def ingest_exercises(
+    session: Session,
+    records: Iterable[Dict[str, Any]],
+    batch_size: int = DEFAULT_ENCODE_BATCH_SIZE,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    skip: int = 0,
+    on_chunk: Optional[Callable[[int], None]] = None
+) -> Dict[str, int]:
+    """Ingest a stream of exercise records chunk by chunk
+
+    ``skip`` source records are passed over first so an interrupted run can
+    resume; ``on_chunk`` is called with the number of source records consumed
+    after every committed chunk.
+    """
+    totals = {"inserted": 0, "updated": 0, "invalid": 0}
+    consumed = skip
+
+    for chunk in _chunks(islice(records, skip, None), chunk_size):
+        consumed += len(chunk)
+        valid = []
+        for record in chunk:
+            cleaned = _clean_record(record)
+            if cleaned is None:
+                totals["invalid"] += 1
+            else:
+                valid.append(cleaned)
+
+        if valid:
+            result = upsert_exercise_chunk(session, valid, batch_size=batch_size)
+            totals["inserted"] += result["inserted"]
+            totals["updated"] += result["updated"]
+
+        if on_chunk:
+            on_chunk(consumed)
+        logger.info(f"Ingested {consumed} records ({totals['inserted']} inserted, {totals['updated']} updated)")
+
+    return totals
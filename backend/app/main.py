@@ -1,16 +1,27 @@
 import os
+import logging
+import threading
 from dotenv import load_dotenv
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.database import create_db_and_tables
+from sqlmodel import Session
+from app.database import create_db_and_tables, engine
+from app.embeddings import embedding_service
+from app.exercise_index import exercise_index
+from app.metrics import registry
+from app.middleware import MetricsMiddleware, ServerTimingMiddleware, SERVER_TIMING_ENABLED
 from app.auth.routes import router as auth_router
 from app.routes.user import router as user_router
 from app.routes.workout import router as workout_router
 from app.routes.progress import router as progress_router
+from app.routes.debug import router as debug_router
 
 # Load environment variables from a .env file
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 app = FastAPI(title="Workout Planner API", version="1.0.0")
 
 # Get the frontend URL from environment variables, with a default for local development
@@ -26,18 +37,55 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-stage timings of each request in a Server-Timing header
+if SERVER_TIMING_ENABLED:
+    app.add_middleware(ServerTimingMiddleware)
+
+# Per-route latency, status and in-flight metrics, served on /metrics
+app.add_middleware(MetricsMiddleware)
+
 # Include all the API routers
 app.include_router(auth_router)
 app.include_router(user_router)
 app.include_router(workout_router)
 app.include_router(progress_router)
+app.include_router(debug_router)
+
+def warm_up():
+    """Load the embedding model and build the exercise index in the background"""
+    embedding_service.warm_up()
+    try:
+        with Session(engine) as session:
+            exercise_index.refresh(session)
+    except Exception as e:
+        logger.error(f"Failed to build exercise index during warm-up: {e}")
 
 @app.on_event("startup")
 def on_startup():
-    """Create database and tables on startup"""
+    """Create database and tables on startup and start warming up in the background"""
     create_db_and_tables()
+    threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
 
 @app.get("/")
 def read_root():
     """Root endpoint for the API"""
-    return {"message": "Workout Planner API is running!"}
\ No newline at end of file
+    return {"message": "Workout Planner API is running!"}
+
+@app.get("/ready")
+def read_ready():
+    """Readiness probe: succeeds once the model is loaded and the exercise index is built"""
+    index_status = exercise_index.status()
+    ready = embedding_service.is_ready and index_status["built"]
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ready" if ready else "warming_up",
+            "model": embedding_service.status(),
+            "exercise_index": index_status
+        }
+    )
+
+@app.get("/metrics", include_in_schema=False)
+def read_metrics():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
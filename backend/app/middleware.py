@@ -0,0 +1,98 @@
+import os
+import time
+
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.metrics import registry
+from app.profiling import request_timing, server_timing_header
+
+# Return per-stage timings of each request in a Server-Timing response header
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "false").lower() in ("1", "true", "yes")
+
+REQUESTS = registry.counter(
+    "http_requests", "HTTP requests by route template and status code", ["method", "route", "status"]
+)
+REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ["method", "route"]
+)
+IN_FLIGHT = registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being served", ["method", "route"]
+)
+EXCEPTIONS = registry.counter(
+    "http_request_exceptions", "Requests that raised an unhandled exception", ["method", "route"]
+)
+
+# Label for paths that match no route, so unknown URLs cannot blow up label cardinality
+UNMATCHED_ROUTE = "unmatched"
+
+
+def route_template(scope: Scope) -> str:
+    """The path template of the route that will serve this request, e.g. /api/workout/plan/{plan_id}"""
+    app = scope.get("app")
+    for route in getattr(getattr(app, "router", None), "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", UNMATCHED_ROUTE)
+    return UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording latency, status codes and in-flight requests per route
+
+    Implemented without BaseHTTPMiddleware so streaming responses are not
+    buffered and the per-request overhead stays at a few microseconds.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = route_template(scope)
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        IN_FLIGHT.inc(method=method, route=route)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            EXCEPTIONS.inc(method=method, route=route)
+            raise
+        finally:
+            REQUEST_DURATION.observe(time.perf_counter() - started, method=method, route=route)
+            REQUESTS.inc(method=method, route=route, status=str(status_code))
+            IN_FLIGHT.dec(method=method, route=route)
+
+
+class ServerTimingMiddleware:
+    """Collect stage timings during a request and report them in a Server-Timing header"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with request_timing() as stages:
+            async def send_wrapper(message: Message):
+                # The handler has finished by the time the response starts
+                if message["type"] == "http.response.start" and stages:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", server_timing_header(stages).encode("latin-1")))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
@@ -1,5 +1,6 @@
 from sqlmodel import SQLModel, Field, Relationship
-from datetime import datetime
+from sqlalchemy import Column, Index, LargeBinary
+from datetime import datetime, date
 from typing import Optional, List
 from enum import Enum
 
@@ -26,6 +27,11 @@ class User(SQLModel, table=True):
     workout_logs: List["WorkoutLog"] = Relationship(back_populates="user")
 
 class Exercise(SQLModel, table=True):
+    __table_args__ = (
+        # Ingestion upserts the catalog by name
+        Index("ix_exercise_name", "name", unique=True),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str
     description: str
@@ -33,13 +39,24 @@ class Exercise(SQLModel, table=True):
     equipment: str
     difficulty: str
     instructions: str
-    embedding: Optional[str] = Field(default=None)  # JSON string of vector
+    embedding: Optional[bytes] = Field(default=None, sa_column=Column(LargeBinary, nullable=True))  # raw float32 bytes
+    embedding_model: Optional[str] = Field(default=None)  # model that produced the embedding
     
     # Relationships
     workout_plan_exercises: List["WorkoutPlanExercise"] = Relationship(back_populates="exercise")
     workout_logs: List["WorkoutLog"] = Relationship(back_populates="exercise")
 
+class CatalogVersion(SQLModel, table=True):
+    """Single row counting exercise catalog writes, so other processes can see that the catalog changed"""
+    id: int = Field(default=1, primary_key=True)
+    version: int = 0
+
 class WorkoutPlan(SQLModel, table=True):
+    __table_args__ = (
+        # Plan lists show a user's most recent plans first
+        Index("ix_workoutplan_user_created_at", "user_id", "created_at"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id")
     name: str
@@ -54,12 +71,17 @@ class WorkoutPlan(SQLModel, table=True):
     exercises: List["WorkoutPlanExercise"] = Relationship(back_populates="workout_plan")
 
 class WorkoutPlanExercise(SQLModel, table=True):
+    __table_args__ = (
+        # Plan pages read one plan's exercises in day/order sequence
+        Index("ix_workoutplanexercise_plan_day_order", "workout_plan_id", "day", "order"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     workout_plan_id: int = Field(foreign_key="workoutplan.id")
     exercise_id: int = Field(foreign_key="exercise.id")
     day: int  # 1-7
     sets: int
-    reps: int
+    reps: Optional[int] = Field(default=None)  # None for timed exercises
     duration: Optional[int] = Field(default=None)  # in seconds
     rest_time: Optional[int] = Field(default=None)  # in seconds
     order: int  # order within the day
@@ -69,6 +91,14 @@ class WorkoutPlanExercise(SQLModel, table=True):
     exercise: Exercise = Relationship(back_populates="workout_plan_exercises")
 
 class WorkoutLog(SQLModel, table=True):
+    __table_args__ = (
+        # Progress queries select one user's logs, usually over a completed_at range;
+        # id breaks ties so /logs pages are keyset range scans on (completed_at, id)
+        Index("ix_workoutlog_user_completed_at", "user_id", "completed_at", "id"),
+        # /logs filtered to one exercise
+        Index("ix_workoutlog_user_exercise_completed_at", "user_id", "exercise_id", "completed_at", "id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id")
     exercise_id: int = Field(foreign_key="exercise.id")
@@ -81,4 +111,27 @@ class WorkoutLog(SQLModel, table=True):
     
     # Relationships
     user: User = Relationship(back_populates="workout_logs")
-    exercise: Exercise = Relationship(back_populates="workout_logs")
\ No newline at end of file
+    exercise: Exercise = Relationship(back_populates="workout_logs")
+
+class DailyWorkoutRollup(SQLModel, table=True):
+    """Per-user, per-day workout totals maintained on every log write"""
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
+    day: date = Field(primary_key=True)
+    workouts_count: int = 0
+    total_duration: int = 0  # in seconds
+
+class DailyMuscleRollup(SQLModel, table=True):
+    """Per-user, per-day count of logged exercises for each muscle group"""
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
+    day: date = Field(primary_key=True)
+    muscle_group: str = Field(primary_key=True)
+    workouts_count: int = 0
+
+class UserStats(SQLModel, table=True):
+    """Lifetime progress counters for a user, maintained on every log write"""
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
+    total_workouts: int = 0
+    total_seconds: int = 0
+    total_minutes: int = 0  # sum of whole minutes per log, as reported by /stats
+    first_workout_at: Optional[datetime] = Field(default=None)
+    muscle_group_counts: Optional[str] = Field(default=None)  # JSON object of muscle group -> count
\ No newline at end of file
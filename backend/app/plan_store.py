@@ -0,0 +1,111 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models import Exercise, UserLevel, WorkoutPlan, WorkoutPlanExercise, WorkoutType
+
+
+async def insert_workout_plans(session: AsyncSession, user_id: int, plans: List[Dict[str, Any]]) -> List[int]:
+    """Bulk-insert generated plans and their exercises, returning the new plan ids in order
+
+    Runs inside the caller's transaction; the caller commits.
+    """
+    created_at = datetime.utcnow()
+    plan_ids = (await session.execute(
+        insert(WorkoutPlan).returning(WorkoutPlan.id, sort_by_parameter_order=True),
+        [
+            {
+                "user_id": user_id,
+                "name": plan["name"],
+                "description": plan["description"],
+                "days_per_week": plan["days_per_week"],
+                "session_duration": plan["session_duration"],
+                "workout_type": WorkoutType(plan["workout_type"]),
+                "user_level": UserLevel(plan["user_level"]),
+                "created_at": created_at
+            }
+            for plan in plans
+        ]
+    )).scalars().all()
+
+    rows = [
+        {
+            "workout_plan_id": plan_id,
+            "exercise_id": exercise["id"],
+            "day": day["day"],
+            "sets": exercise["sets"],
+            "reps": exercise["reps"],
+            "duration": exercise["duration"],
+            "rest_time": exercise["rest_time"],
+            "order": exercise["order"]
+        }
+        for plan_id, plan in zip(plan_ids, plans)
+        for day in plan["days"]
+        for exercise in day["exercises"]
+    ]
+    if rows:
+        await session.execute(insert(WorkoutPlanExercise), rows)
+    return list(plan_ids)
+
+
+async def list_workout_plans(session: AsyncSession, user_id: int, limit: int) -> List[WorkoutPlan]:
+    """A user's saved plans, newest first"""
+    statement = (
+        select(WorkoutPlan)
+        .where(WorkoutPlan.user_id == user_id)
+        .order_by(WorkoutPlan.created_at.desc(), WorkoutPlan.id.desc())
+        .limit(limit)
+    )
+    return list((await session.exec(statement)).all())
+
+
+async def load_workout_plan(session: AsyncSession, user_id: int, plan_id: int) -> Optional[Dict[str, Any]]:
+    """Load a saved plan with all of its exercises in one query, shaped like a generated plan"""
+    statement = (
+        select(
+            WorkoutPlan,
+            WorkoutPlanExercise.day, WorkoutPlanExercise.sets, WorkoutPlanExercise.reps,
+            WorkoutPlanExercise.duration, WorkoutPlanExercise.rest_time, WorkoutPlanExercise.order,
+            Exercise.id, Exercise.name, Exercise.description, Exercise.target_muscle, Exercise.equipment
+        )
+        .outerjoin(WorkoutPlanExercise, WorkoutPlanExercise.workout_plan_id == WorkoutPlan.id)
+        .outerjoin(Exercise, Exercise.id == WorkoutPlanExercise.exercise_id)
+        .where(WorkoutPlan.id == plan_id, WorkoutPlan.user_id == user_id)
+        .order_by(WorkoutPlanExercise.day, WorkoutPlanExercise.order)
+    )
+    rows = (await session.exec(statement)).all()
+    if not rows:
+        return None
+
+    plan = rows[0][0]
+    days: Dict[int, List[Dict[str, Any]]] = {day: [] for day in range(1, plan.days_per_week + 1)}
+    for _, day, sets, reps, duration, rest_time, order, exercise_id, name, description, target_muscle, equipment in rows:
+        if exercise_id is None:
+            continue  # plan without exercises
+        days.setdefault(day, []).append({
+            'id': exercise_id,
+            'name': name,
+            'description': description,
+            'target_muscle': target_muscle,
+            'equipment': equipment,
+            'sets': sets,
+            'reps': reps,
+            'duration': duration,
+            'rest_time': rest_time,
+            'order': order
+        })
+
+    return {
+        'id': plan.id,
+        'name': plan.name,
+        'description': plan.description,
+        'days_per_week': plan.days_per_week,
+        'session_duration': plan.session_duration,
+        'workout_type': plan.workout_type,
+        'user_level': plan.user_level,
+        'created_at': plan.created_at,
+        'days': [{'day': day, 'exercises': exercises} for day, exercises in sorted(days.items())]
+    }
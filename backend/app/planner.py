@@ -1,96 +1,260 @@
-from typing import List, Dict, Any
-from app.models import WorkoutType, UserLevel, Exercise
+from typing import List, Dict, Any, Optional, Tuple
+from app.models import WorkoutType, UserLevel
 from app.embeddings import embedding_service
-from sqlmodel import Session, select
+from app.exercise_index import exercise_index, IndexSnapshot
+from app.bitmaps import intersect
 from app.database import get_session
-import json
+from app.concurrency import BoundedExecutor
+from app.cache import TTLCache
+from app.metrics import registry
+from app.profiling import stage
+import numpy as np
+import copy
+import hashlib
+import os
 import random
 
+# Plan generation is CPU and DB bound; it runs on this pool so the event loop stays free
+PLANNER_MAX_WORKERS = int(os.getenv("PLANNER_MAX_WORKERS", "2"))
+PLANNER_MAX_QUEUE = int(os.getenv("PLANNER_MAX_QUEUE", "32"))
+# Generated plans are deterministic per (catalog, preferences), so they are cached;
+# the catalog fingerprint is part of the key and a catalog change clears the cache
+PLAN_CACHE_SIZE = int(os.getenv("PLAN_CACHE_SIZE", "1024"))
+
+# Exercises ranked per plan, spread across its days
+PLAN_CANDIDATES = 20
+
+NO_MATCH_ERROR = "No exercises match the requested equipment, focus areas and difficulty."
+
+PLANS = registry.counter(
+    "planner_plans", "Plan requests answered by the planner, by where the plan came from", ["source"]
+)
+PLAN_GENERATION_SECONDS = registry.histogram(
+    "planner_generation_seconds", "Time to generate a plan that was not cached"
+)
+
 class WorkoutPlannerService:
     def __init__(self):
-        pass
+        self._catalog_fingerprint: Optional[str] = None
     
-    def _get_exercises_from_db(self, session: Session) -> List[Dict[str, Any]]:
-        """Get exercises from database and convert to dict format"""
-        statement = select(Exercise)
-        exercises = session.exec(statement).all()
+    @staticmethod
+    def preferences_key(preferences: Dict[str, Any]) -> tuple:
+        """Normalized preferences; requests with the same key get the same plan"""
+        return (
+            tuple(sorted({area.lower() for area in preferences.get('focus_areas', [])})),
+            tuple(sorted({eq.lower() for eq in preferences.get('available_equipment', [])})),
+            embedding_service.preference_value(preferences.get('workout_type', 'strength')),
+            embedding_service.preference_value(preferences.get('user_level', 'beginner')),
+            preferences.get('days_per_week', 3),
+            preferences.get('session_duration', 60),
+            tuple(sorted({d.lower() for d in preferences.get('difficulty') or []})),
+            bool(preferences.get('strict', False))
+        )
+    
+    @staticmethod
+    def candidate_masks(index: IndexSnapshot, preferences: Dict[str, Any]) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """(preferred, fallback) row masks for ranking
+
+        Preferred exercises match the equipment, focus areas and difficulty.
+        In strict mode there is no fallback. Otherwise the remaining slots are
+        filled from exercises matching the equipment alone, or from the whole
+        catalog when nothing matches the equipment.
+        """
+        available_equipment = [eq.lower() for eq in preferences.get('available_equipment', [])]
+        if 'bodyweight' not in available_equipment:
+            available_equipment.append('bodyweight')
+        focus_areas = preferences.get('focus_areas') or None
+        difficulties = preferences.get('difficulty') or None
         
-        exercises_list = []
-        for exercise in exercises:
-            exercise_dict = {
-                "id": exercise.id,
-                "name": exercise.name,
-                "description": exercise.description,
-                "target_muscle": exercise.target_muscle,
-                "equipment": exercise.equipment,
-                "difficulty": exercise.difficulty,
-                "instructions": exercise.instructions
-            }
-            
-            # Parse embedding if it exists
-            if exercise.embedding:
-                try:
-                    embedding = json.loads(exercise.embedding)
-                    exercise_dict['embedding'] = embedding
-                except json.JSONDecodeError:
-                    exercise_dict['embedding'] = []
-            else:
-                exercise_dict['embedding'] = []
-            
-            exercises_list.append(exercise_dict)
+        equipment_bitmap = index.filter_bitmap(equipment=available_equipment)
+        if not preferences.get('strict', False) and not equipment_bitmap.any():
+            equipment_bitmap = index.filter_bitmap()  # Fallback to all exercises
         
-        return exercises_list
+        preferred_bitmap = intersect(equipment_bitmap, index.filter_bitmap(target_muscles=focus_areas, difficulties=difficulties))
+        if preferences.get('strict', False):
+            return index.to_mask(preferred_bitmap), None
+        
+        # Remaining equipment matches, used only when too few exercises are preferred
+        fallback_bitmap = np.bitwise_and(equipment_bitmap, np.invert(preferred_bitmap))
+        return index.to_mask(preferred_bitmap), index.to_mask(fallback_bitmap)
     
-    def create_workout_plan(self, preferences: Dict[str, Any], user_id: int) -> Dict[str, Any]:
+    @staticmethod
+    def rank_candidates(index: IndexSnapshot, ranked: List[Tuple[int, float]], mask: np.ndarray, limit: int) -> List[Dict[str, Any]]:
+        """Exercise records for ranked rows, or the first rows of the mask when nothing could be ranked"""
+        if not ranked:
+            return [index.records[idx] for idx in np.flatnonzero(mask)[:limit]]
+        
+        exercises = []
+        for idx, similarity in ranked:
+            exercise = index.records[idx].copy()
+            exercise['similarity'] = similarity
+            exercises.append(exercise)
+        return exercises
+    
+    def cached_plan(self, preferences: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached plan for these preferences without touching the database"""
+        index = exercise_index.current()
+        if index is None:
+            return None
+        plan = plan_cache.get((index.fingerprint, self.preferences_key(preferences)))
+        if plan is None:
+            return None
+        PLANS.inc(source="cache")
+        return copy.deepcopy(plan)
+    
+    def create_workout_plan(self, preferences: Dict[str, Any], user_id: int, use_cache: bool = True) -> Dict[str, Any]:
         """Create a workout plan based on user preferences"""
+        with PLAN_GENERATION_SECONDS.time():
+            return self._create_workout_plan(preferences, user_id, use_cache)
+    
+    def _create_workout_plan(self, preferences: Dict[str, Any], user_id: int, use_cache: bool) -> Dict[str, Any]:
         # Get a database session
         session_gen = get_session()
         session = next(session_gen)
         
         try:
-            # Get exercises from database
-            exercises = self._get_exercises_from_db(session)
+            # Get the in-memory exercise index (rebuilt only when the catalog changes)
+            with stage("plan.catalog_load"):
+                index = exercise_index.get(session)
             
-            if not exercises:
+            if not len(index):
+                PLANS.inc(source="error")
                 return {"error": "No exercises found in database. Please seed the database first."}
             
-            query = embedding_service.create_query_from_preferences(preferences)
-            query_embedding = embedding_service.create_embedding(query)
+            self._track_catalog(index)
+            cache_key = (index.fingerprint, self.preferences_key(preferences))
+            cached = plan_cache.get(cache_key) if use_cache else None
+            if cached is not None:
+                PLANS.inc(source="cache")
+                return copy.deepcopy(cached)
+            
+            # Candidate sets from the equipment, muscle and difficulty bitmaps
+            with stage("plan.candidate_filter"):
+                preferred_mask, fallback_mask = self.candidate_masks(index, preferences)
+            
+            if fallback_mask is None and not preferred_mask.any():
+                PLANS.inc(source="error")
+                return {"error": NO_MATCH_ERROR}
+            
+            with stage("plan.query_build"):
+                query = embedding_service.create_query_from_preferences(preferences)
+            query_embedding = embedding_service.create_query_embedding(query)
+            
+            # Rank the candidates against the query in one pass over the index
+            with stage("plan.similarity_rank"):
+                ranked = index.search(query_embedding, top_k=PLAN_CANDIDATES, mask=preferred_mask)
+            similar_exercises = self.rank_candidates(index, ranked, preferred_mask, PLAN_CANDIDATES)
             
-            available_equipment = [eq.lower() for eq in preferences.get('available_equipment', [])]
-            if 'bodyweight' not in available_equipment:
-                available_equipment.append('bodyweight')
+            if fallback_mask is not None and len(similar_exercises) < PLAN_CANDIDATES:
+                # Too few exercises match the focus areas and difficulty; top up from the equipment matches
+                limit = PLAN_CANDIDATES - len(similar_exercises)
+                with stage("plan.similarity_rank"):
+                    ranked = index.search(query_embedding, top_k=limit, mask=fallback_mask)
+                similar_exercises += self.rank_candidates(index, ranked, fallback_mask, limit)
             
-            # Filter exercises by available equipment
-            filtered_exercises = [
-                ex for ex in exercises 
-                if ex.get('equipment', '').lower() in available_equipment
-            ]
+            with stage("plan.structure"):
+                return self._finish_plan(cache_key, preferences, similar_exercises)
             
-            if not filtered_exercises:
-                filtered_exercises = exercises  # Fallback to all exercises
+        finally:
+            session.close()
+    
+    def create_workout_plans(self, preferences_list: List[Dict[str, Any]], use_cache: bool = True) -> List[Dict[str, Any]]:
+        """Create plans for many preference sets in one pass
+
+        Identical preference sets are generated once, all uncached queries are
+        encoded in one batched forward pass, and candidates for every query are
+        scored with blocked matrix-matrix products. Results follow the input
+        order; a failed entry is a dict with an "error" key.
+        """
+        session_gen = get_session()
+        session = next(session_gen)
+        
+        try:
+            with stage("plan.catalog_load"):
+                index = exercise_index.get(session)
             
-            # Find similar exercises if embeddings are available
-            exercise_embeddings = [ex for ex in filtered_exercises if ex.get('embedding')]
+            if not len(index):
+                PLANS.inc(len(preferences_list), source="error")
+                return [{"error": "No exercises found in database. Please seed the database first."} for _ in preferences_list]
             
-            if query_embedding and exercise_embeddings:
-                similar_exercises = embedding_service.find_similar_exercises(
-                    query_embedding, exercise_embeddings, top_k=20
-                )
-            else:
-                similar_exercises = filtered_exercises[:20]
+            self._track_catalog(index)
+            results: List[Optional[Dict[str, Any]]] = [None] * len(preferences_list)
             
-            if not similar_exercises:
-                similar_exercises = filtered_exercises[:10]
+            # Serve cached plans; group the rest by normalized preferences so each is generated once
+            pending: Dict[tuple, List[int]] = {}
+            for position, preferences in enumerate(preferences_list):
+                cache_key = (index.fingerprint, self.preferences_key(preferences))
+                cached = plan_cache.get(cache_key) if use_cache and cache_key not in pending else None
+                if cached is not None:
+                    PLANS.inc(source="cache")
+                    results[position] = copy.deepcopy(cached)
+                else:
+                    pending.setdefault(cache_key, []).append(position)
             
-            plan = self._generate_plan_structure(preferences, similar_exercises)
+            keys = list(pending)
+            preferences_by_key = [preferences_list[pending[key][0]] for key in keys]
             
-            return plan
+            with stage("plan.candidate_filter"):
+                masks = [self.candidate_masks(index, preferences) for preferences in preferences_by_key]
+            
+            with stage("plan.query_build"):
+                queries = [embedding_service.create_query_from_preferences(p) for p in preferences_by_key]
+            query_embeddings = embedding_service.create_query_embeddings(queries)
+            
+            with stage("plan.similarity_rank"):
+                ranked = index.search_batch(query_embeddings, PLAN_CANDIDATES, [mask for mask, _ in masks])
+                exercises = [
+                    self.rank_candidates(index, ranked[i], preferred_mask, PLAN_CANDIDATES)
+                    for i, (preferred_mask, _) in enumerate(masks)
+                ]
+                
+                # Top up preference sets with too few preferred exercises, batched by how many
+                # are missing so each query searches with the same top_k as the single path
+                top_up: Dict[int, List[int]] = {}
+                for i, (_, fallback_mask) in enumerate(masks):
+                    if fallback_mask is not None and len(exercises[i]) < PLAN_CANDIDATES:
+                        top_up.setdefault(PLAN_CANDIDATES - len(exercises[i]), []).append(i)
+                for limit, group in top_up.items():
+                    ranked = index.search_batch(
+                        [query_embeddings[i] for i in group], limit, [masks[i][1] for i in group]
+                    )
+                    for i, ranked_fallback in zip(group, ranked):
+                        exercises[i] += self.rank_candidates(index, ranked_fallback, masks[i][1], limit)
+            
+            with stage("plan.structure"):
+                for i, (key, preferences) in enumerate(zip(keys, preferences_by_key)):
+                    if not exercises[i]:
+                        PLANS.inc(len(pending[key]), source="error")
+                        plan = {"error": NO_MATCH_ERROR}
+                    else:
+                        plan = self._finish_plan(key, preferences, exercises[i])
+                        if len(pending[key]) > 1:
+                            PLANS.inc(len(pending[key]) - 1, source="cache")
+                    
+                    for n, position in enumerate(pending[key]):
+                        results[position] = plan if n == 0 else copy.deepcopy(plan)
+            
+            return results
             
         finally:
             session.close()
     
-    def _generate_plan_structure(self, preferences: Dict[str, Any], exercises: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _track_catalog(self, index: IndexSnapshot):
+        if index.fingerprint != self._catalog_fingerprint:
+            # Plans built from an older catalog can never be served again
+            plan_cache.clear()
+            self._catalog_fingerprint = index.fingerprint
+    
+    def _finish_plan(self, cache_key: tuple, preferences: Dict[str, Any], exercises: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Build the plan structure from ranked exercises and cache it"""
+        # Seed from the cache key so the same catalog and preferences always give the same plan
+        seed = int.from_bytes(hashlib.sha256(repr(cache_key).encode()).digest()[:8], "big")
+        plan = self._generate_plan_structure(preferences, exercises, random.Random(seed))
+        plan_cache.set(cache_key, copy.deepcopy(plan))
+        PLANS.inc(source="generated")
+        return plan
+    
+    def _generate_plan_structure(self, preferences: Dict[str, Any], exercises: List[Dict[str, Any]], rng: random.Random) -> Dict[str, Any]:
         """Generate the actual workout plan structure"""
         days_per_week = preferences.get('days_per_week', 3)
         session_duration = preferences.get('session_duration', 60)
@@ -122,14 +286,14 @@ class WorkoutPlannerService:
                 day_exercise_list = exercises[:exercises_per_day]
             
             for idx, exercise in enumerate(day_exercise_list):
-                sets = random.randint(*sets_range)
-                reps = random.randint(*reps_range)
+                sets = rng.randint(*sets_range)
+                reps = rng.randint(*reps_range)
                 
                 reps_val = reps
                 duration = None
                 
                 if workout_type == 'cardio' or 'cardio' in exercise.get('description', '').lower():
-                    duration = random.randint(30, 60)
+                    duration = rng.randint(30, 60)
                     reps_val = None
                 
                 day_exercises.append({
@@ -161,5 +325,8 @@ class WorkoutPlannerService:
             'days': days
         }
 
-# Global instance
-planner_service = WorkoutPlannerService()
\ No newline at end of file
+# Global instances
+planner_service = WorkoutPlannerService()
+planner_pool = BoundedExecutor("planner", PLANNER_MAX_WORKERS, PLANNER_MAX_QUEUE)
+plan_cache = TTLCache(PLAN_CACHE_SIZE)
+registry.gauge("planner_plan_cache_entries", "Plans held in the plan cache").set_function(lambda: len(plan_cache))
\ No newline at end of file
@@ -0,0 +1,139 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.metrics import registry
+
+# Number of most recent timings per stage used for the rolling percentiles
+STAGE_WINDOW = int(os.getenv("STAGE_TIMING_WINDOW", "1024"))
+
+STAGE_SECONDS = registry.histogram("stage_seconds", "Time spent in instrumented pipeline stages", ["stage"])
+
+# Timings of the current request, set by ServerTimingMiddleware; None outside a request.
+# BoundedExecutor copies the context, so stages run on worker threads are recorded too.
+_request_stages: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("request_stages", default=None)
+
+
+class StageTimings:
+    """Rolling window of recent durations per stage"""
+
+    def __init__(self, window: int = STAGE_WINDOW):
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float):
+        with self._lock:
+            samples = self._samples.get(stage)
+            if samples is None:
+                samples = self._samples[stage] = deque(maxlen=self.window)
+            samples.append(seconds)
+            self._counts[stage] = self._counts.get(stage, 0) + 1
+
+    def percentiles(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            samples = {stage: np.array(values) * 1000 for stage, values in self._samples.items()}
+            counts = dict(self._counts)
+        return {
+            stage: {
+                "count": counts[stage],
+                "window": len(values),
+                "p50_ms": float(np.percentile(values, 50)),
+                "p95_ms": float(np.percentile(values, 95)),
+                "p99_ms": float(np.percentile(values, 99)),
+                "max_ms": float(values.max())
+            }
+            for stage, values in samples.items()
+        }
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+
+
+@contextmanager
+def stage(name: str):
+    """Time a pipeline stage into the rolling percentiles, the metrics and the current request"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        stage_timings.record(name, elapsed)
+        STAGE_SECONDS.observe(elapsed, stage=name)
+        request_stages = _request_stages.get()
+        if request_stages is not None:
+            request_stages.append((name, elapsed))
+
+
+@contextmanager
+def request_timing():
+    """Collect the stages timed inside the block, including those run on executor threads"""
+    stages: List[Tuple[str, float]] = []
+    token = _request_stages.set(stages)
+    try:
+        yield stages
+    finally:
+        _request_stages.reset(token)
+
+
+def server_timing_header(stages: List[Tuple[str, float]]) -> str:
+    """Format stage timings as a Server-Timing header, summing repeated stages"""
+    totals: Dict[str, float] = {}
+    for name, seconds in stages:
+        totals[name] = totals.get(name, 0.0) + seconds
+    return ", ".join(f"{name};dur={seconds * 1000:.3f}" for name, seconds in totals.items())
+
+
+class SamplingProfiler:
+    """Samples the stack of the thread running a call and aggregates it into folded stacks
+
+    Folded stacks ("outer;inner;leaf count" per line) are the input format of
+    flamegraph.pl, speedscope and most other flame graph viewers.
+    """
+
+    def __init__(self, interval: float = 0.001):
+        self.interval = interval
+
+    def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Tuple[Any, Counter]:
+        """Call ``fn`` on the current thread while sampling it; returns (result, folded stack counts)"""
+        target = threading.get_ident()
+        stacks: Counter = Counter()
+        done = threading.Event()
+
+        def sample():
+            while not done.wait(self.interval):
+                frame = sys._current_frames().get(target)
+                if frame is not None:
+                    stacks[self._fold(frame)] += 1
+
+        sampler = threading.Thread(target=sample, name="sampling-profiler", daemon=True)
+        sampler.start()
+        try:
+            result = fn(*args, **kwargs)
+        finally:
+            done.set()
+            sampler.join()
+        return result, stacks
+
+    @staticmethod
+    def _fold(frame) -> str:
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+
+# Global instance
+stage_timings = StageTimings()
@@ -0,0 +1,63 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+import os
+import time
+from app.schemas import WorkoutPlanCreate
+from app.auth.utils import get_current_user
+from app.auth.cache import AuthenticatedUser
+from app.planner import planner_service, planner_pool
+from app.profiling import SamplingProfiler, request_timing, stage_timings
+from app.concurrency import PoolSaturatedError
+
+# Profiling endpoints expose internals and cost CPU, so they are off unless enabled
+DEBUG_ENDPOINTS_ENABLED = os.getenv("DEBUG_ENDPOINTS_ENABLED", "false").lower() in ("1", "true", "yes")
+
+def require_debug_enabled():
+    if not DEBUG_ENDPOINTS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+router = APIRouter(prefix="/api/debug", tags=["debug"], dependencies=[Depends(require_debug_enabled)])
+
+@router.get("/stages")
+async def get_stage_timings(current_user: AuthenticatedUser = Depends(get_current_user)):
+    """Rolling latency percentiles of each instrumented pipeline stage"""
+    return stage_timings.percentiles()
+
+@router.post("/profile/plan")
+async def profile_workout_plan(
+    plan_request: WorkoutPlanCreate,
+    interval_ms: float = Query(1.0, ge=0.1, le=50.0),
+    format: str = Query("json", pattern="^(json|folded)$"),
+    current_user: AuthenticatedUser = Depends(get_current_user)
+):
+    """Generate one plan (bypassing the plan cache) under a sampling profiler
+
+    ``format=folded`` returns folded stacks ready for flamegraph.pl or speedscope.
+    """
+    preferences = plan_request.model_dump()
+    profiler = SamplingProfiler(interval=interval_ms / 1000)
+
+    try:
+        with request_timing() as stages:
+            started = time.perf_counter()
+            plan, stacks = await planner_pool.run(
+                profiler.run, planner_service.create_workout_plan, preferences, current_user.id, use_cache=False
+            )
+            elapsed = time.perf_counter() - started
+    except PoolSaturatedError:
+        raise HTTPException(status_code=503, detail="Planner pool is saturated", headers={"Retry-After": "1"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error profiling workout plan: {str(e)}")
+
+    folded = [f"{stack} {count}" for stack, count in stacks.most_common()]
+    if format == "folded":
+        return PlainTextResponse("\n".join(folded) + "\n")
+
+    return {
+        "elapsed_ms": elapsed * 1000,
+        "interval_ms": interval_ms,
+        "samples": sum(stacks.values()),
+        "stages": [{"stage": name, "ms": seconds * 1000} for name, seconds in stages],
+        "error": plan.get("error"),
+        "folded": folded
+    }
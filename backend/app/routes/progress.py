@@ -1,32 +1,53 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
-from typing import List, Set, TypedDict
-from datetime import datetime, timedelta
-from app.database import get_session
-from app.models import User, WorkoutLog, Exercise
-from app.schemas import WorkoutLogCreate, WorkoutLogResponse, ProgressStats, ProgressHistory
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, insert, text, tuple_
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import List, Optional
+from datetime import datetime, timedelta, timezone
+from app.database import get_async_session, async_session_factory, async_engine
+from app.models import WorkoutLog, Exercise, DailyWorkoutRollup, DailyMuscleRollup, UserStats
+from app.schemas import (
+    WorkoutLogCreate, WorkoutLogResponse, WorkoutLogBatchCreate, WorkoutLogBatchItem, WorkoutLogBatchResponse,
+    WorkoutLogPage, ProgressStats, ProgressHistory, MuscleHeatmap
+)
 from app.auth.utils import get_current_user
+from app.auth.cache import AuthenticatedUser
+from app.aggregates import apply_workout_logs, load_muscle_group_counts
 from collections import defaultdict
+import base64
+import binascii
+import csv
+import io
+import json
+import logging
+import os
 
-router = APIRouter(prefix="/api/progress", tags=["progress"])
+logger = logging.getLogger(__name__)
+
+# Rows fetched per round trip from the server-side cursor, and encoded per response chunk
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "5000"))
+# Comma-separated emails allowed to export every user's logs (scope=all)
+EXPORT_ADMIN_EMAILS = {email.strip().lower() for email in os.getenv("EXPORT_ADMIN_EMAILS", "").split(",") if email.strip()}
 
-# Define a TypedDict for more precise type hinting in the defaultdict
-class DailyStat(TypedDict):
-    workouts_count: int
-    total_duration: int
-    muscle_groups: Set[str]
+EXPORT_COLUMNS = [
+    "id", "user_id", "exercise_id", "exercise_name", "sets_completed", "reps_completed",
+    "duration_completed", "weight_used", "notes", "completed_at"
+]
+
+router = APIRouter(prefix="/api/progress", tags=["progress"])
 
 
 @router.post("/log", response_model=WorkoutLogResponse)
 async def log_workout(
     log_data: WorkoutLogCreate,
-    current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session)
 ):
     """Log a completed workout"""
     try:
         # Verify exercise exists
-        exercise = session.get(Exercise, log_data.exercise_id)
+        exercise = await session.get(Exercise, log_data.exercise_id)
         if not exercise:
             raise HTTPException(status_code=404, detail="Exercise not found")
         
@@ -45,8 +66,10 @@ async def log_workout(
         )
         
         session.add(workout_log)
-        session.commit()
-        session.refresh(workout_log)
+        # Keep the daily rollups in step with the log in the same transaction
+        await session.run_sync(apply_workout_logs, [(workout_log, exercise.target_muscle)])
+        await session.commit()
+        await session.refresh(workout_log)
         
         assert workout_log.id is not None, "Workout log ID should not be None after database refresh"
         
@@ -66,11 +89,78 @@ async def log_workout(
         raise HTTPException(status_code=500, detail=f"Error logging workout: {str(e)}")
 
 
+@router.post("/log/batch", response_model=WorkoutLogBatchResponse)
+async def log_workout_batch(
+    batch: WorkoutLogBatchCreate,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """Log many completed exercises in a single transaction"""
+    try:
+        # Assert that the user ID is not None to satisfy the type checker
+        assert current_user.id is not None, "Current user must have a valid ID"
+
+        # Validate every referenced exercise with a single IN query
+        exercise_ids = {entry.exercise_id for entry in batch.entries}
+        statement = select(Exercise.id, Exercise.name, Exercise.target_muscle).where(Exercise.id.in_(exercise_ids))
+        exercises = {exercise_id: (name, target_muscle) for exercise_id, name, target_muscle in (await session.exec(statement)).all()}
+
+        results: List[WorkoutLogBatchItem] = []
+        accepted = []
+        completed_at = datetime.utcnow()
+        for index, entry in enumerate(batch.entries):
+            if entry.exercise_id not in exercises:
+                results.append(WorkoutLogBatchItem(index=index, success=False, error="Exercise not found"))
+                continue
+            accepted.append((index, WorkoutLog(
+                user_id=current_user.id,
+                exercise_id=entry.exercise_id,
+                sets_completed=entry.sets_completed,
+                reps_completed=entry.reps_completed,
+                duration_completed=entry.duration_completed,
+                weight_used=entry.weight_used,
+                notes=entry.notes,
+                completed_at=completed_at
+            )))
+
+        if accepted:
+            rows = [log.model_dump(exclude={"id"}) for _, log in accepted]
+            log_ids = (await session.execute(
+                insert(WorkoutLog).returning(WorkoutLog.id, sort_by_parameter_order=True), rows
+            )).scalars().all()
+
+            await session.run_sync(apply_workout_logs, [(log, exercises[log.exercise_id][1]) for _, log in accepted])
+            await session.commit()
+
+            for (index, log), log_id in zip(accepted, log_ids):
+                results.append(WorkoutLogBatchItem(index=index, success=True, log=WorkoutLogResponse(
+                    id=log_id,
+                    exercise_id=log.exercise_id,
+                    exercise_name=exercises[log.exercise_id][0],
+                    sets_completed=log.sets_completed,
+                    reps_completed=log.reps_completed,
+                    duration_completed=log.duration_completed,
+                    weight_used=log.weight_used,
+                    notes=log.notes,
+                    completed_at=log.completed_at
+                )))
+
+        results.sort(key=lambda item: item.index)
+        return WorkoutLogBatchResponse(
+            logged=len(accepted),
+            failed=len(results) - len(accepted),
+            results=results
+        )
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error logging workouts: {str(e)}")
+
+
 @router.get("/history", response_model=List[ProgressHistory])
 async def get_progress_history(
     days: int = 7,
-    current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session)
 ):
     """Get workout history for the past N days"""
     try:
@@ -81,33 +171,31 @@ async def get_progress_history(
         end_date = datetime.utcnow()
         start_date = end_date - timedelta(days=days)
         
-        # Query workout logs
-        statement = select(WorkoutLog, Exercise).join(Exercise).where(
-            WorkoutLog.user_id == current_user.id,
-            WorkoutLog.completed_at >= start_date,
-            WorkoutLog.completed_at <= end_date
+        # Range read over at most `days` + 1 rollup rows
+        statement = select(DailyWorkoutRollup).where(
+            DailyWorkoutRollup.user_id == current_user.id,
+            DailyWorkoutRollup.day >= start_date.date(),
+            DailyWorkoutRollup.day <= end_date.date()
         )
+        rollups = (await session.exec(statement)).all()
         
-        results = session.exec(statement).all()
-        
-        # Use the strongly-typed DailyStat for the defaultdict
-        daily_stats = defaultdict(lambda: DailyStat(workouts_count=0, total_duration=0, muscle_groups=set()))
-        
-        for log, exercise in results:
-            date_str = log.completed_at.strftime('%Y-%m-%d')
-            daily_stats[date_str]['workouts_count'] += 1
-            if log.duration_completed:
-                daily_stats[date_str]['total_duration'] += log.duration_completed
-            daily_stats[date_str]['muscle_groups'].add(exercise.target_muscle)
+        muscle_statement = select(DailyMuscleRollup.day, DailyMuscleRollup.muscle_group).where(
+            DailyMuscleRollup.user_id == current_user.id,
+            DailyMuscleRollup.day >= start_date.date(),
+            DailyMuscleRollup.day <= end_date.date()
+        )
+        muscle_groups_by_day = defaultdict(list)
+        for day, muscle_group in (await session.exec(muscle_statement)).all():
+            muscle_groups_by_day[day].append(muscle_group)
         
         # Convert to response format
         history = []
-        for date_str, stats in daily_stats.items():
+        for rollup in rollups:
             history.append(ProgressHistory(
-                date=date_str,
-                workouts_count=stats['workouts_count'],
-                total_duration=stats['total_duration'],
-                muscle_groups=list(stats['muscle_groups'])
+                date=rollup.day.strftime('%Y-%m-%d'),
+                workouts_count=rollup.workouts_count,
+                total_duration=rollup.total_duration,
+                muscle_groups=muscle_groups_by_day[rollup.day]
             ))
         
         history.sort(key=lambda x: x.date)
@@ -118,36 +206,67 @@ async def get_progress_history(
         raise HTTPException(status_code=500, detail=f"Error fetching progress history: {str(e)}")
 
 
+@router.get("/heatmap", response_model=MuscleHeatmap)
+async def get_muscle_heatmap(
+    days: int = Query(30, ge=1, le=366),
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """Exercises logged per muscle group per day over the past N days, as a dense grid"""
+    try:
+        # Assert that the user ID is not None
+        assert current_user.id is not None, "Current user must have a valid ID"
+
+        end_day = datetime.utcnow().date()
+        start_day = end_day - timedelta(days=days)
+
+        statement = select(
+            DailyMuscleRollup.muscle_group, DailyMuscleRollup.day, func.sum(DailyMuscleRollup.workouts_count)
+        ).where(
+            DailyMuscleRollup.user_id == current_user.id,
+            DailyMuscleRollup.day >= start_day,
+            DailyMuscleRollup.day <= end_day
+        ).group_by(DailyMuscleRollup.muscle_group, DailyMuscleRollup.day)
+        cells = (await session.exec(statement)).all()
+
+        # Every day in the range gets a column, so gaps show as zeros rather than disappearing
+        dates = [start_day + timedelta(days=offset) for offset in range(days + 1)]
+        muscle_groups = sorted({muscle_group for muscle_group, _, _ in cells})
+        rows = {muscle_group: [0] * len(dates) for muscle_group in muscle_groups}
+        for muscle_group, day, count in cells:
+            rows[muscle_group][(day - start_day).days] = int(count)
+
+        return MuscleHeatmap(
+            dates=[day.strftime('%Y-%m-%d') for day in dates],
+            muscle_groups=muscle_groups,
+            counts=[rows[muscle_group] for muscle_group in muscle_groups]
+        )
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching muscle heatmap: {str(e)}")
+
+
 @router.get("/stats", response_model=ProgressStats)
 async def get_progress_stats(
-    current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session)
 ):
     """Get overall progress statistics"""
     try:
         # Assert that the user ID is not None
         assert current_user.id is not None, "Current user must have a valid ID"
 
-        # Query all workout logs for user
-        statement = select(WorkoutLog, Exercise).join(Exercise).where(
-            WorkoutLog.user_id == current_user.id
-        )
-        
-        results = session.exec(statement).all()
+        # Lifetime counters are maintained on every log write
+        stats = await session.get(UserStats, current_user.id)
         
-        total_workouts = len(results)
-        total_time_minutes = 0
-        muscle_groups: Set[str] = set()
-        
-        for log, exercise in results:
-            if log.duration_completed:
-                total_time_minutes += log.duration_completed // 60
-            muscle_groups.add(exercise.target_muscle)
+        total_workouts = stats.total_workouts if stats else 0
+        total_time_minutes = stats.total_minutes if stats else 0
+        muscle_group_counts = load_muscle_group_counts(stats)
+        muscle_groups = [muscle for muscle, count in muscle_group_counts.items() if count > 0]
         
         # Calculate average workouts per week
-        if results:
-            first_workout = min(log.completed_at for log, _ in results)
-            weeks_since_first = (datetime.utcnow() - first_workout).days / 7
+        if stats and stats.first_workout_at:
+            weeks_since_first = (datetime.utcnow() - stats.first_workout_at).days / 7
             avg_workouts_per_week = total_workouts / max(weeks_since_first, 1)
         else:
             avg_workouts_per_week = 0
@@ -155,9 +274,185 @@ async def get_progress_stats(
         return ProgressStats(
             total_workouts=total_workouts,
             total_time_minutes=total_time_minutes,
-            muscle_groups_trained=list(muscle_groups),
+            muscle_groups_trained=muscle_groups,
             avg_workouts_per_week=round(avg_workouts_per_week, 2)
         )
         
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching progress stats: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error fetching progress stats: {str(e)}")
+
+def _utc_naive(value: Optional[datetime]) -> Optional[datetime]:
+    """completed_at is stored as naive UTC; convert offset-aware query bounds to match"""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _encode_log_cursor(completed_at: datetime, log_id: int) -> str:
+    payload = json.dumps([completed_at.isoformat(), log_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _decode_log_cursor(cursor: str):
+    """(completed_at, id) of the last row of the previous page"""
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        completed_at, log_id = json.loads(payload)
+        return datetime.fromisoformat(completed_at), int(log_id)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@router.get("/logs", response_model=WorkoutLogPage)
+async def list_workout_logs(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    exercise_id: Optional[int] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """Page through the user's workout logs, newest first
+
+    Pass ``next_cursor`` from a page to get the one after it. Each page seeks
+    past the previous page's last (completed_at, id) instead of using an
+    offset, so deep pages cost the same as the first.
+    """
+    after = _decode_log_cursor(cursor) if cursor else None
+    start, end = _utc_naive(start), _utc_naive(end)
+    if start is not None and end is not None and start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    try:
+        # Assert that the user ID is not None
+        assert current_user.id is not None, "Current user must have a valid ID"
+
+        statement = select(
+            WorkoutLog.id, WorkoutLog.exercise_id, Exercise.name, WorkoutLog.sets_completed,
+            WorkoutLog.reps_completed, WorkoutLog.duration_completed, WorkoutLog.weight_used,
+            WorkoutLog.notes, WorkoutLog.completed_at
+        ).join(Exercise, Exercise.id == WorkoutLog.exercise_id).where(WorkoutLog.user_id == current_user.id)
+
+        if exercise_id is not None:
+            statement = statement.where(WorkoutLog.exercise_id == exercise_id)
+        if start is not None:
+            statement = statement.where(WorkoutLog.completed_at >= start)
+        if end is not None:
+            statement = statement.where(WorkoutLog.completed_at < end)
+        if after is not None:
+            statement = statement.where(tuple_(WorkoutLog.completed_at, WorkoutLog.id) < after)
+
+        # One extra row tells us whether another page follows
+        statement = statement.order_by(WorkoutLog.completed_at.desc(), WorkoutLog.id.desc()).limit(limit + 1)
+        rows = (await session.exec(statement)).all()
+
+        items = [
+            WorkoutLogResponse(
+                id=log_id,
+                exercise_id=log_exercise_id,
+                exercise_name=name,
+                sets_completed=sets_completed,
+                reps_completed=reps_completed,
+                duration_completed=duration_completed,
+                weight_used=weight_used,
+                notes=notes,
+                completed_at=completed_at
+            )
+            for (log_id, log_exercise_id, name, sets_completed, reps_completed,
+                 duration_completed, weight_used, notes, completed_at) in rows[:limit]
+        ]
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = _encode_log_cursor(items[-1].completed_at, items[-1].id)
+
+        return WorkoutLogPage(items=items, next_cursor=next_cursor)
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error listing workout logs: {str(e)}")
+
+
+def _export_statement(user_id: Optional[int], start: Optional[datetime], end: Optional[datetime]):
+    statement = select(
+        WorkoutLog.id, WorkoutLog.user_id, WorkoutLog.exercise_id, Exercise.name,
+        WorkoutLog.sets_completed, WorkoutLog.reps_completed, WorkoutLog.duration_completed,
+        WorkoutLog.weight_used, WorkoutLog.notes, WorkoutLog.completed_at
+    ).join(Exercise, Exercise.id == WorkoutLog.exercise_id)
+
+    if start is not None:
+        statement = statement.where(WorkoutLog.completed_at >= start)
+    if end is not None:
+        statement = statement.where(WorkoutLog.completed_at < end)
+
+    if user_id is not None:
+        # Walks ix_workoutlog_user_completed_at in order, so no sort is needed
+        return statement.where(WorkoutLog.user_id == user_id).order_by(WorkoutLog.completed_at, WorkoutLog.id)
+    # Primary key order keeps a tenant-wide export a plain scan rather than a 50M row sort
+    return statement.order_by(WorkoutLog.id)
+
+
+def _export_values(row) -> list:
+    return [value.isoformat() if isinstance(value, datetime) else value for value in row]
+
+
+def _encode_csv(rows, header: bool = False) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_COLUMNS)
+    writer.writerows(_export_values(row) for row in rows)
+    return buffer.getvalue()
+
+
+def _encode_ndjson(rows) -> str:
+    return "".join(json.dumps(dict(zip(EXPORT_COLUMNS, _export_values(row)))) + "\n" for row in rows)
+
+
+async def _stream_export(statement, format: str):
+    """Yield the export one cursor batch at a time, so memory stays flat however many rows match"""
+    # The response outlives the request's session dependency, so the stream owns its session
+    async with async_session_factory() as session:
+        if async_engine.dialect.name == "postgresql":
+            # A full export may legitimately run longer than DB_STATEMENT_TIMEOUT_MS
+            await session.execute(text("SET LOCAL statement_timeout = 0"))
+
+        if format == "csv":
+            yield _encode_csv([], header=True)
+
+        exported = 0
+        try:
+            result = await session.stream(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+            async for rows in result.partitions():
+                exported += len(rows)
+                yield _encode_csv(rows) if format == "csv" else _encode_ndjson(rows)
+        except Exception:
+            # Headers are already sent, so the client only sees a truncated body
+            logger.exception(f"Workout log export failed after {exported} rows")
+            raise
+
+
+@router.get("/export")
+async def export_workout_logs(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    scope: str = Query("user", pattern="^(user|all)$"),
+    current_user: AuthenticatedUser = Depends(get_current_user)
+):
+    """Stream workout logs completed in [start, end) as CSV or NDJSON
+
+    ``scope=all`` exports every user's logs and is limited to EXPORT_ADMIN_EMAILS.
+    """
+    if scope == "all" and current_user.email.lower() not in EXPORT_ADMIN_EMAILS:
+        raise HTTPException(status_code=403, detail="Not allowed to export all users' workout logs")
+    start, end = _utc_naive(start), _utc_naive(end)
+    if start is not None and end is not None and start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+
+    statement = _export_statement(None if scope == "all" else current_user.id, start, end)
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"workout_logs.{'csv' if format == 'csv' else 'ndjson'}"
+    return StreamingResponse(
+        _stream_export(statement, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -1,12 +1,12 @@
 from fastapi import APIRouter, Depends
-from app.models import User
 from app.schemas import UserResponse
 from app.auth.utils import get_current_user
+from app.auth.cache import AuthenticatedUser
 
 router = APIRouter(prefix="/api/user", tags=["user"])
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_info(current_user: User = Depends(get_current_user)):
+async def get_current_user_info(current_user: AuthenticatedUser = Depends(get_current_user)):
     # Add an assertion to ensure current_user.id is not None
     assert current_user.id is not None, "User ID should not be None"
     
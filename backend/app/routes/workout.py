@@ -1,38 +1,126 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session
-from app.database import get_session
-from app.models import User
-from app.schemas import WorkoutPlanCreate, WorkoutPlanResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import List
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.database import get_async_session
+from app.schemas import (
+    WorkoutPlanCreate, WorkoutPlanResponse, WorkoutPlanSummary,
+    WorkoutPlanBulkCreate, WorkoutPlanBulkItem, WorkoutPlanBulkResponse
+)
 from app.auth.utils import get_current_user
-from app.planner import planner_service
+from app.auth.cache import AuthenticatedUser
+from app.planner import planner_service, planner_pool
+from app.plan_store import insert_workout_plans, list_workout_plans, load_workout_plan
+from app.concurrency import PoolSaturatedError
 
 router = APIRouter(prefix="/api/workout", tags=["workout"])
 
 @router.post("/plan", response_model=WorkoutPlanResponse)
 async def create_workout_plan(
     plan_request: WorkoutPlanCreate,
-    current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session)
 ):
-    """Generate a workout plan based on user preferences"""
+    """Generate a workout plan based on user preferences and save it"""
     try:
         # Add an assertion to ensure the user ID is not None
         assert current_user.id is not None, "User ID cannot be None"
 
         # Convert request to dictionary
-        preferences = {
-            'focus_areas': plan_request.focus_areas,
-            'available_equipment': plan_request.available_equipment,
-            'workout_type': plan_request.workout_type,
-            'user_level': plan_request.user_level,
-            'days_per_week': plan_request.days_per_week,
-            'session_duration': plan_request.session_duration
-        }
-        
-        # Generate plan using planner service
-        plan = planner_service.create_workout_plan(preferences, current_user.id)
-        
+        preferences = plan_request.model_dump()
+
+        # Serve identical preferences from the plan cache, otherwise generate on the planner pool
+        plan = planner_service.cached_plan(preferences)
+        if plan is None:
+            plan = await planner_pool.run(planner_service.create_workout_plan, preferences, current_user.id)
+        if "error" in plan:
+            raise HTTPException(status_code=404, detail=plan["error"])
+
+        # Save the plan and its exercises in one transaction
+        plan_ids = await insert_workout_plans(session, current_user.id, [plan])
+        await session.commit()
+        plan["id"] = plan_ids[0]
+
         return WorkoutPlanResponse(**plan)
-        
+
+    except HTTPException:
+        raise
+    except PoolSaturatedError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many workout plans are being generated, please retry shortly",
+            headers={"Retry-After": "1"}
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error generating workout plan: {str(e)}")
+
+@router.post("/plans/bulk", response_model=WorkoutPlanBulkResponse)
+async def create_workout_plans_bulk(
+    bulk_request: WorkoutPlanBulkCreate,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """Generate and save plans for many preference sets at once, e.g. for a coaching cohort"""
+    try:
+        preferences_list = [plan_request.model_dump() for plan_request in bulk_request.requests]
+
+        # One planner task for the whole batch: shared catalog load, batched encode and scoring
+        plans = await planner_pool.run(planner_service.create_workout_plans, preferences_list)
+
+        generated = [(index, plan) for index, plan in enumerate(plans) if "error" not in plan]
+        results = [
+            WorkoutPlanBulkItem(index=index, success=False, error=plan["error"])
+            for index, plan in enumerate(plans) if "error" in plan
+        ]
+
+        if generated:
+            # Save every generated plan and its exercises in one transaction
+            plan_ids = await insert_workout_plans(session, current_user.id, [plan for _, plan in generated])
+            await session.commit()
+            for (index, plan), plan_id in zip(generated, plan_ids):
+                plan["id"] = plan_id
+                results.append(WorkoutPlanBulkItem(index=index, success=True, plan=WorkoutPlanResponse(**plan)))
+
+        results.sort(key=lambda item: item.index)
+        return WorkoutPlanBulkResponse(generated=len(generated), failed=len(plans) - len(generated), results=results)
+
+    except PoolSaturatedError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many workout plans are being generated, please retry shortly",
+            headers={"Retry-After": "1"}
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error generating workout plans: {str(e)}")
+
+@router.get("/plans", response_model=List[WorkoutPlanSummary])
+async def get_workout_plans(
+    limit: int = Query(20, ge=1, le=100),
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """List the user's saved workout plans, newest first"""
+    try:
+        plans = await list_workout_plans(session, current_user.id, limit)
+        return [WorkoutPlanSummary(**plan.model_dump(exclude={"user_id"})) for plan in plans]
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching workout plans: {str(e)}")
+
+@router.get("/plan/{plan_id}", response_model=WorkoutPlanResponse)
+async def get_workout_plan(
+    plan_id: int,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """Load a saved workout plan with its exercises"""
+    try:
+        plan = await load_workout_plan(session, current_user.id, plan_id)
+        if plan is None:
+            raise HTTPException(status_code=404, detail="Workout plan not found")
+
+        return WorkoutPlanResponse(**plan)
+
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error generating workout plan: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error fetching workout plan: {str(e)}")
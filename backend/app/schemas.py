@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from typing import Optional, List
 from datetime import datetime
 from app.models import WorkoutType, UserLevel
@@ -32,6 +32,8 @@ class WorkoutPlanCreate(BaseModel):
     user_level: UserLevel
     days_per_week: int
     session_duration: int
+    difficulty: Optional[List[str]] = None  # exercise difficulties to draw from
+    strict: bool = False  # only use exercises matching every filter exactly
 
 class ExerciseInPlan(BaseModel):
     id: int
@@ -57,8 +59,33 @@ class WorkoutPlanResponse(BaseModel):
     session_duration: int
     workout_type: WorkoutType
     user_level: UserLevel
+    created_at: Optional[datetime] = None
     days: List[DayPlan]
 
+class WorkoutPlanSummary(BaseModel):
+    id: int
+    name: str
+    description: str
+    days_per_week: int
+    session_duration: int
+    workout_type: WorkoutType
+    user_level: UserLevel
+    created_at: datetime
+
+class WorkoutPlanBulkCreate(BaseModel):
+    requests: List[WorkoutPlanCreate] = Field(min_length=1, max_length=2000)
+
+class WorkoutPlanBulkItem(BaseModel):
+    index: int  # position of the preference set in the request
+    success: bool
+    plan: Optional[WorkoutPlanResponse] = None
+    error: Optional[str] = None
+
+class WorkoutPlanBulkResponse(BaseModel):
+    generated: int
+    failed: int
+    results: List[WorkoutPlanBulkItem]
+
 # Workout Log schemas
 class WorkoutLogCreate(BaseModel):
     exercise_id: int
@@ -79,6 +106,24 @@ class WorkoutLogResponse(BaseModel):
     notes: Optional[str] = None
     completed_at: datetime
 
+class WorkoutLogPage(BaseModel):
+    items: List[WorkoutLogResponse]
+    next_cursor: Optional[str] = None
+
+class WorkoutLogBatchCreate(BaseModel):
+    entries: List[WorkoutLogCreate] = Field(min_length=1, max_length=500)
+
+class WorkoutLogBatchItem(BaseModel):
+    index: int  # position of the entry in the request
+    success: bool
+    log: Optional[WorkoutLogResponse] = None
+    error: Optional[str] = None
+
+class WorkoutLogBatchResponse(BaseModel):
+    logged: int
+    failed: int
+    results: List[WorkoutLogBatchItem]
+
 # Progress schemas
 class ProgressStats(BaseModel):
     total_workouts: int
@@ -90,4 +135,10 @@ class ProgressHistory(BaseModel):
     date: str
     workouts_count: int
     total_duration: int
-    muscle_groups: List[str]
\ No newline at end of file
+    muscle_groups: List[str]
+
+class MuscleHeatmap(BaseModel):
+    """Dense muscle group x date grid: counts[i][j] is exercises logged for muscle_groups[i] on dates[j]"""
+    dates: List[str]
+    muscle_groups: List[str]
+    counts: List[List[int]]
@@ -0,0 +1,28 @@
+import numpy as np
+from typing import List, Optional, Sequence, Union
+
+# Embeddings are stored as raw little-endian float32 bytes
+VECTOR_DTYPE = np.dtype('<f4')
+
+
+def encode_vector(vector: Union[Sequence[float], np.ndarray]) -> Optional[bytes]:
+    """Encode an embedding as raw float32 bytes for storage"""
+    array = np.asarray(vector, dtype=VECTOR_DTYPE)
+    if array.size == 0:
+        return None
+    return array.tobytes()
+
+
+def decode_vector(data: Optional[bytes]) -> np.ndarray:
+    """Decode a stored embedding without materializing per-float Python objects"""
+    if not data:
+        return np.zeros(0, dtype=np.float32)
+    return np.frombuffer(data, dtype=VECTOR_DTYPE).astype(np.float32, copy=False)
+
+
+def decode_matrix(blobs: List[bytes], dimension: int) -> np.ndarray:
+    """Decode equally sized stored embeddings into a contiguous (n, dimension) matrix"""
+    if not blobs:
+        return np.zeros((0, dimension), dtype=np.float32)
+    matrix = np.frombuffer(b"".join(blobs), dtype=VECTOR_DTYPE).reshape(len(blobs), dimension)
+    return matrix.astype(np.float32, copy=True)
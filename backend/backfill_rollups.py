@@ -0,0 +1,51 @@
+# backend/backfill_rollups.py
+"""Rebuild the daily progress rollups from existing workout logs.
+
+Usage:
+    python backfill_rollups.py [--batch-size 500]
+
+Users are processed in id order, one transaction per batch, so the command
+can be re-run or interrupted safely. Each batch holds its users' row locks
+while it rebuilds, so it can run against a live API: log writes for those
+users wait for the batch to commit instead of being lost or counted twice.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+
+from sqlmodel import Session, select
+from app.database import engine
+from app.models import User
+from app.aggregates import rebuild_daily_rollups
+
+
+def backfill_rollups(batch_size: int = 500):
+    """Recompute daily rollups for every user"""
+    processed = 0
+    last_id = 0
+    with Session(engine) as session:
+        while True:
+            user_ids = session.exec(
+                select(User.id).where(User.id > last_id).order_by(User.id).limit(batch_size)
+            ).all()
+            if not user_ids:
+                break
+
+            rebuild_daily_rollups(session, list(user_ids))
+            session.commit()
+
+            processed += len(user_ids)
+            last_id = user_ids[-1]
+            print(f"Rebuilt rollups for {processed} users")
+
+    print("Backfill complete!")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild daily progress rollups")
+    parser.add_argument("--batch-size", type=int, default=500,
+                        help="users per transaction; their log writes wait while it runs")
+    args = parser.parse_args()
+    backfill_rollups(args.batch_size)
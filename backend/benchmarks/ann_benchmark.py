@@ -0,0 +1,103 @@
+# backend/benchmarks/ann_benchmark.py
+"""Compare exact and IVF exercise search on synthetic catalogs.
+
+Reports recall@k against exact search plus p50/p99 query latency for each
+catalog size and IVF n_probe setting.
+
+Usage:
+    python benchmarks/ann_benchmark.py --sizes 10000 100000 1000000 --output ann.json
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from app.ann import ExactSearch, IVFSearch
+
+
+def synthetic_catalog(n_rows: int, dimension: int, n_clusters: int, rng: np.random.Generator) -> np.ndarray:
+    """Clustered unit vectors, which is how real exercise embeddings are distributed"""
+    centers = rng.standard_normal((n_clusters, dimension)).astype(np.float32)
+    matrix = np.empty((n_rows, dimension), dtype=np.float32)
+    for start in range(0, n_rows, 100_000):
+        stop = min(n_rows, start + 100_000)
+        labels = rng.integers(0, n_clusters, size=stop - start)
+        chunk = centers[labels] + 0.6 * rng.standard_normal((stop - start, dimension)).astype(np.float32)
+        matrix[start:stop] = chunk / np.linalg.norm(chunk, axis=1, keepdims=True)
+    return matrix
+
+
+def time_queries(search, queries, top_k):
+    latencies, results = [], []
+    for query in queries:
+        started = time.perf_counter()
+        indices, _ = search(query, top_k)
+        latencies.append(time.perf_counter() - started)
+        results.append(indices)
+    latencies_ms = np.array(latencies) * 1000
+    return results, {
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p99_ms": float(np.percentile(latencies_ms, 99)),
+    }
+
+
+def recall(truth, results, top_k):
+    hits = sum(len(np.intersect1d(t, r)) for t, r in zip(truth, results))
+    return hits / (top_k * len(truth))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark exact vs IVF exercise search")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=20)
+    parser.add_argument("--n-probe", type=int, nargs="+", default=[1, 4, 8, 16, 32])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    report = {"dimension": args.dimension, "top_k": args.top_k, "results": []}
+
+    for size in args.sizes:
+        matrix = synthetic_catalog(size, args.dimension, max(16, size // 100), rng)
+        queries = matrix[rng.choice(size, size=args.queries, replace=False)].copy()
+        queries += 0.1 * rng.standard_normal(queries.shape).astype(np.float32)
+        queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+        exact = ExactSearch(matrix)
+        truth, exact_latency = time_queries(exact.search, queries, args.top_k)
+        report["results"].append({"size": size, "backend": "exact", "recall": 1.0, **exact_latency})
+        print(f"n={size:>9} exact            recall=1.000 p50={exact_latency['p50_ms']:.2f}ms p99={exact_latency['p99_ms']:.2f}ms")
+
+        started = time.perf_counter()
+        ivf = IVFSearch(matrix)
+        build_seconds = time.perf_counter() - started
+
+        for n_probe in args.n_probe:
+            results, latency = time_queries(
+                lambda q, k: ivf.search(q, k, n_probe=n_probe), queries, args.top_k
+            )
+            entry = {
+                "size": size, "backend": "ivf", "n_lists": ivf.n_lists, "n_probe": n_probe,
+                "build_seconds": build_seconds, "recall": recall(truth, results, args.top_k), **latency
+            }
+            report["results"].append(entry)
+            print(
+                f"n={size:>9} ivf nprobe={n_probe:<4} recall={entry['recall']:.3f} "
+                f"p50={latency['p50_ms']:.2f}ms p99={latency['p99_ms']:.2f}ms"
+            )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+# backend/benchmarks/load_test.py
+"""HTTP load test for the main API routes.
+
+Starts the API against a temporary SQLite database (or --database-url, e.g.
+an ephemeral Postgres) with a stubbed embedding model and a synthetic
+exercise catalog. Then --concurrency virtual users each send a weighted mix
+of requests for --seconds. The JSON report records the git commit and the
+settings, plus throughput and p50/p95/p99 latency per route. Compare
+reports across commits to catch regressions.
+
+Usage:
+    python benchmarks/load_test.py --concurrency 32 --seconds 30 --output load.json
+    python benchmarks/load_test.py --mix plan=1,log=4,history=2,stats=2 --concurrency 8
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+
+import httpx
+import numpy as np
+
+from benchmarks.stub_model import configure_stub_environment, install_stub_model
+
+PASSWORD = "load-test-password"
+DEFAULT_MIX = "login=1,plan=2,log=5,history=3,stats=3"
+
+FOCUS_AREAS = ["chest", "back", "legs", "shoulders", "arms", "core", "full body"]
+EQUIPMENT = ["bodyweight", "dumbbells", "barbell", "kettlebell", "resistance bands", "pull-up bar"]
+WORKOUT_TYPES = ["strength", "cardio", "flexibility", "mixed"]
+USER_LEVELS = ["beginner", "intermediate", "advanced"]
+
+
+def parse_mix(value: str) -> dict:
+    mix = {}
+    for part in value.split(","):
+        route, _, weight = part.partition("=")
+        if route not in ROUTES:
+            raise argparse.ArgumentTypeError(f"Unknown route {route!r}; choose from {', '.join(ROUTES)}")
+        mix[route] = float(weight or 1)
+    return mix
+
+
+def git_commit() -> dict:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=root, capture_output=True, text=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain"], cwd=root, capture_output=True, text=True).stdout.strip())
+    except OSError:
+        return {"commit": None, "dirty": None}
+    return {"commit": commit or None, "dirty": dirty}
+
+
+def synthetic_exercises(count: int, rng: random.Random):
+    for i in range(count):
+        muscle = rng.choice(FOCUS_AREAS)
+        equipment = rng.choice(EQUIPMENT)
+        yield {
+            "name": f"Load Test Exercise {i}",
+            "description": f"{rng.choice(WORKOUT_TYPES)} movement for the {muscle} using {equipment}",
+            "target_muscle": muscle,
+            "equipment": equipment,
+            "difficulty": rng.choice(USER_LEVELS),
+            "instructions": "Perform with controlled tempo"
+        }
+
+
+def seed_catalog(count: int, seed: int):
+    from sqlmodel import Session
+    from app.database import engine
+    from app.ingestion import ingest_exercises
+
+    with Session(engine) as session:
+        ingest_exercises(session, synthetic_exercises(count, random.Random(seed)))
+
+
+class VirtualUser:
+    """One account sending requests through a shared client"""
+
+    def __init__(self, client: httpx.AsyncClient, index: int, rng: random.Random, plan_variety: int):
+        self.client = client
+        self.email = f"load{index}@example.com"
+        self.rng = rng
+        self.plan_variety = plan_variety
+        self.headers = {}
+        self.exercise_ids = []
+
+    def preferences(self) -> dict:
+        # Draw from a fixed pool so some requests repeat, like real users picking common options
+        choice = random.Random(self.rng.randrange(self.plan_variety))
+        return {
+            "focus_areas": choice.sample(FOCUS_AREAS, 2),
+            "available_equipment": choice.sample(EQUIPMENT, 2),
+            "workout_type": choice.choice(WORKOUT_TYPES),
+            "user_level": choice.choice(USER_LEVELS),
+            "days_per_week": choice.randint(2, 5),
+            "session_duration": choice.choice([30, 45, 60])
+        }
+
+    async def setup(self):
+        await self.client.post("/api/auth/register", json={"email": self.email, "password": PASSWORD, "full_name": "Load"})
+        await self.login()
+        response = await self.plan()
+        if response.status_code != 200:
+            raise RuntimeError(f"Plan setup failed for {self.email}: {response.status_code} {response.text}")
+        self.exercise_ids = [e["id"] for day in response.json()["days"] for e in day["exercises"]]
+
+    async def login(self):
+        response = await self.client.post("/api/auth/login", json={"email": self.email, "password": PASSWORD})
+        if response.status_code == 200:
+            self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        return response
+
+    async def plan(self):
+        return await self.client.post("/api/workout/plan", json=self.preferences(), headers=self.headers)
+
+    async def log(self):
+        return await self.client.post("/api/progress/log", headers=self.headers, json={
+            "exercise_id": self.rng.choice(self.exercise_ids),
+            "sets_completed": self.rng.randint(1, 5),
+            "reps_completed": self.rng.randint(5, 15),
+            "duration_completed": self.rng.randint(30, 600)
+        })
+
+    async def history(self):
+        return await self.client.get(f"/api/progress/history?days={self.rng.choice([7, 30, 90])}", headers=self.headers)
+
+    async def stats(self):
+        return await self.client.get("/api/progress/stats", headers=self.headers)
+
+
+# Route name -> (label reported in results, VirtualUser method)
+ROUTES = {
+    "login": ("POST /api/auth/login", VirtualUser.login),
+    "plan": ("POST /api/workout/plan", VirtualUser.plan),
+    "log": ("POST /api/progress/log", VirtualUser.log),
+    "history": ("GET /api/progress/history", VirtualUser.history),
+    "stats": ("GET /api/progress/stats", VirtualUser.stats),
+}
+
+
+async def drive(user: VirtualUser, mix: dict, deadline: float, samples: dict):
+    routes, weights = list(mix), list(mix.values())
+    while time.perf_counter() < deadline:
+        route = user.rng.choices(routes, weights)[0]
+        started = time.perf_counter()
+        try:
+            response = await ROUTES[route][1](user)
+            status = response.status_code
+        except httpx.HTTPError:
+            status = None
+        samples[route].append((time.perf_counter() - started, status))
+
+
+def summarize(samples: list, seconds: float) -> dict:
+    latencies = np.array([latency for latency, _ in samples]) * 1000
+    statuses = {}
+    for _, status in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    errors = sum(1 for _, status in samples if status is None or status >= 400)
+    if not len(latencies):
+        return {"requests": 0}
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "throughput_rps": len(samples) / seconds,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "max_ms": float(latencies.max()),
+        "status_counts": statuses,
+    }
+
+
+async def run(base_url: str, mix: dict, concurrency: int, seconds: float, warmup: float,
+              plan_variety: int, seed: int) -> dict:
+    limits = httpx.Limits(max_connections=concurrency + 10)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        users = [VirtualUser(client, i, random.Random(seed + i), plan_variety) for i in range(concurrency)]
+        await asyncio.gather(*(user.setup() for user in users))
+
+        if warmup:
+            discarded = {route: [] for route in mix}
+            deadline = time.perf_counter() + warmup
+            await asyncio.gather(*(drive(user, mix, deadline, discarded) for user in users))
+
+        samples = {route: [] for route in mix}
+        started = time.perf_counter()
+        await asyncio.gather(*(drive(user, mix, started + seconds, samples) for user in users))
+        elapsed = time.perf_counter() - started
+
+    all_samples = [sample for route_samples in samples.values() for sample in route_samples]
+    return {
+        "routes": {ROUTES[route][0]: summarize(route_samples, elapsed) for route, route_samples in samples.items()},
+        "total": summarize(all_samples, elapsed),
+        "elapsed_seconds": elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f"route weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--concurrency", type=int, default=16, help="virtual users sending requests at once")
+    parser.add_argument("--seconds", type=float, default=20.0, help="measured duration")
+    parser.add_argument("--warmup", type=float, default=3.0, help="unmeasured duration before measuring")
+    parser.add_argument("--exercises", type=int, default=500, help="size of the synthetic exercise catalog")
+    parser.add_argument("--plan-variety", type=int, default=50, help="distinct plan preference sets in use")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--database-url", help="database to run against (default: temporary SQLite file)")
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        configure_stub_environment(tmp)
+        from benchmarks.server import BackgroundServer
+
+        database_url = args.database_url or f"sqlite:///{os.path.join(tmp, 'load_test.db')}"
+        server = BackgroundServer(database_url)
+        install_stub_model()
+        with server:
+            seed_catalog(args.exercises, args.seed)
+            results = asyncio.run(run(
+                server.base_url, args.mix, args.concurrency, args.seconds, args.warmup, args.plan_variety, args.seed
+            ))
+
+    report = {
+        **git_commit(),
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "database": "sqlite" if args.database_url is None else args.database_url.split(":", 1)[0],
+        "config": {
+            "mix": args.mix, "concurrency": args.concurrency, "seconds": args.seconds, "warmup": args.warmup,
+            "exercises": args.exercises, "plan_variety": args.plan_variety, "seed": args.seed,
+        },
+        **results,
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# backend/benchmarks/login_storm.py
+"""Measure non-auth request latency while the API absorbs a login storm.
+
+A probe requests GET / at a steady rate, first on an idle server and then
+while --concurrency clients log in as fast as they can. With password
+hashing on the auth pool the probe's p99 should barely move.
+
+Usage:
+    python benchmarks/login_storm.py --concurrency 50 --seconds 10 --output login_storm.json
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+
+import httpx
+import numpy as np
+
+from benchmarks.server import BackgroundServer
+
+PASSWORD = "benchmark-password"
+
+
+def percentiles(latencies):
+    if not latencies:
+        return None
+    values = np.array(latencies) * 1000
+    return {
+        "count": len(latencies),
+        "p50_ms": float(np.percentile(values, 50)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "p99_ms": float(np.percentile(values, 99)),
+    }
+
+
+async def probe(client: httpx.AsyncClient, seconds: float, interval: float):
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        await client.get("/")
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def login_loop(client: httpx.AsyncClient, email: str, seconds: float, outcomes: dict):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        response = await client.post("/api/auth/login", json={"email": email, "password": PASSWORD})
+        outcomes[response.status_code] = outcomes.get(response.status_code, 0) + 1
+        if response.status_code == 503:
+            await asyncio.sleep(float(response.headers.get("Retry-After", "1")))
+
+
+async def run(base_url: str, concurrency: int, seconds: float, interval: float) -> dict:
+    limits = httpx.Limits(max_connections=concurrency + 10)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        emails = [f"storm{i}@example.com" for i in range(concurrency)]
+        for email in emails:
+            await client.post("/api/auth/register", json={"email": email, "password": PASSWORD, "full_name": "Storm"})
+
+        idle = await probe(client, seconds, interval)
+
+        outcomes: dict = {}
+        storm = [login_loop(client, email, seconds, outcomes) for email in emails]
+        results = await asyncio.gather(probe(client, seconds, interval), *storm)
+
+    return {
+        "concurrency": concurrency,
+        "seconds": seconds,
+        "probe_idle": percentiles(idle),
+        "probe_during_storm": percentiles(results[0]),
+        "login_status_counts": {str(code): count for code, count in sorted(outcomes.items())},
+        "logins_per_second": outcomes.get(200, 0) / seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark latency during a login storm")
+    parser.add_argument("--concurrency", type=int, default=50, help="concurrent login clients")
+    parser.add_argument("--seconds", type=float, default=10.0, help="duration of each phase")
+    parser.add_argument("--probe-interval", type=float, default=0.02)
+    parser.add_argument("--database-url", help="database to run against (default: temporary SQLite file)")
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{os.path.join(tmp, 'login_storm.db')}"
+        with BackgroundServer(database_url) as server:
+            report = asyncio.run(run(server.base_url, args.concurrency, args.seconds, args.probe_interval))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+# backend/benchmarks/query_plans.py
+"""Check that the log and plan queries are answered with index range scans.
+
+Fills a scratch database with synthetic users, plans and --logs workout
+logs, runs ANALYZE, then EXPLAINs the per-user log and per-plan exercise
+queries and verifies each plan uses the expected composite index. Exits
+non-zero if any query falls back to a full scan.
+
+Usage:
+    python benchmarks/query_plans.py --database-url postgresql://user:pw@localhost/plans_bench --logs 10000000
+    python benchmarks/query_plans.py --database-url sqlite:///plans_bench.db --logs 10000000 --output plans.json
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, func, text, tuple_
+from sqlmodel import SQLModel, select
+
+from app.models import WorkoutLog, WorkoutPlanExercise
+
+CHUNK_SIZE = 1_000_000
+
+# Row generators per dialect; each template inserts rows numbered :start + 1 .. :stop
+SERIES = {
+    "postgresql": "SELECT g AS n FROM generate_series(:start + 1, :stop) AS g",
+    "sqlite": "WITH RECURSIVE seq(n) AS (SELECT :start + 1 UNION ALL SELECT n + 1 FROM seq WHERE n < :stop) "
+              "SELECT n FROM seq",
+}
+DAYS_AGO = {
+    "postgresql": "now() - (s.n % 730) * interval '1 day'",
+    "sqlite": "datetime('now', '-' || (s.n % 730) || ' days')",
+}
+INDEX_SCANS = ("Index Scan", "Index Only Scan", "Bitmap Index Scan")
+
+
+def insert_series(connection, dialect: str, count: int, insert_sql: str, label: str, **params):
+    """Run ``insert_sql`` (selecting from alias ``s`` with column ``n``) over 1..count in chunks"""
+    for start in range(0, count, CHUNK_SIZE):
+        stop = min(count, start + CHUNK_SIZE)
+        sql = insert_sql.format(series=SERIES[dialect], days_ago=DAYS_AGO[dialect])
+        connection.execute(text(sql), {"start": start, "stop": stop, **params})
+        print(f"  {label}: {stop}/{count}")
+
+
+def populate(engine, users: int, exercises: int, logs: int, plans_per_user: int, exercises_per_plan: int):
+    dialect = engine.dialect.name
+    with engine.begin() as connection:
+        insert_series(connection, dialect, users, """
+            INSERT INTO "user" (email, hashed_password, full_name, is_active, created_at)
+            SELECT 'bench' || s.n || '@example.com', 'x', 'Bench User', true, CURRENT_TIMESTAMP
+            FROM ({series}) AS s
+        """, "users")
+        insert_series(connection, dialect, exercises, """
+            INSERT INTO exercise (name, description, target_muscle, equipment, difficulty, instructions)
+            SELECT 'Exercise ' || s.n, '', 'muscle' || (s.n % 12), 'bodyweight', 'beginner', ''
+            FROM ({series}) AS s
+        """, "exercises")
+        insert_series(connection, dialect, users * plans_per_user, """
+            INSERT INTO workoutplan (user_id, name, description, days_per_week, session_duration,
+                                     workout_type, user_level, created_at)
+            SELECT 1 + (s.n % :users), 'Plan ' || s.n, '', 3, 60, 'STRENGTH', 'BEGINNER', CURRENT_TIMESTAMP
+            FROM ({series}) AS s
+        """, "plans", users=users)
+        insert_series(connection, dialect, users * plans_per_user * exercises_per_plan, """
+            INSERT INTO workoutplanexercise (workout_plan_id, exercise_id, day, sets, reps, "order")
+            SELECT 1 + (s.n / :per_plan), 1 + (s.n % :exercises), 1 + (s.n % 3), 3, 10, s.n % :per_plan
+            FROM ({series}) AS s
+        """, "plan exercises", per_plan=exercises_per_plan, exercises=exercises)
+        insert_series(connection, dialect, logs, """
+            INSERT INTO workoutlog (user_id, exercise_id, sets_completed, reps_completed,
+                                    duration_completed, completed_at)
+            SELECT 1 + (s.n % :users), 1 + (s.n % :exercises), 3, 10, 60 + (s.n % 600), {days_ago}
+            FROM ({series}) AS s
+        """, "workout logs", users=users, exercises=exercises)
+        connection.execute(text("ANALYZE"))
+
+
+def checked_queries(user_id: int, plan_id: int):
+    """(name, statement, expected index) for the access paths the API relies on"""
+    since = datetime.utcnow() - timedelta(days=30)
+    duration = func.coalesce(WorkoutLog.duration_completed, 0)
+    return [
+        (
+            "user_logs_in_range",
+            select(WorkoutLog)
+            .where(WorkoutLog.user_id == user_id, WorkoutLog.completed_at >= since)
+            .order_by(WorkoutLog.completed_at),
+            "ix_workoutlog_user_completed_at",
+        ),
+        (
+            "user_log_totals",
+            select(WorkoutLog.user_id, func.count(WorkoutLog.id), func.sum(duration), func.min(WorkoutLog.completed_at))
+            .where(WorkoutLog.user_id.in_([user_id]))
+            .group_by(WorkoutLog.user_id),
+            "ix_workoutlog_user_completed_at",
+        ),
+        (
+            "user_logs_keyset_page",
+            select(WorkoutLog)
+            .where(WorkoutLog.user_id == user_id, tuple_(WorkoutLog.completed_at, WorkoutLog.id) < (since, 0))
+            .order_by(WorkoutLog.completed_at.desc(), WorkoutLog.id.desc())
+            .limit(50),
+            "ix_workoutlog_user_completed_at",
+        ),
+        (
+            "user_exercise_logs_keyset_page",
+            select(WorkoutLog)
+            .where(
+                WorkoutLog.user_id == user_id, WorkoutLog.exercise_id == 1,
+                tuple_(WorkoutLog.completed_at, WorkoutLog.id) < (since, 0)
+            )
+            .order_by(WorkoutLog.completed_at.desc(), WorkoutLog.id.desc())
+            .limit(50),
+            "ix_workoutlog_user_exercise_completed_at",
+        ),
+        (
+            "plan_exercises",
+            select(WorkoutPlanExercise)
+            .where(WorkoutPlanExercise.workout_plan_id == plan_id)
+            .order_by(WorkoutPlanExercise.day, WorkoutPlanExercise.order),
+            "ix_workoutplanexercise_plan_day_order",
+        ),
+    ]
+
+
+def _postgres_plan(connection, sql: str):
+    plan = connection.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    nodes, stack = [], [plan[0]["Plan"]]
+    while stack:
+        node = stack.pop()
+        nodes.append(node)
+        stack.extend(node.get("Plans", []))
+    summary = [f"{node['Node Type']} {node.get('Index Name', '')}".strip() for node in nodes]
+    return summary, lambda index: any(
+        node["Node Type"] in INDEX_SCANS and node.get("Index Name") == index for node in nodes
+    )
+
+
+def _sqlite_plan(connection, sql: str):
+    rows = connection.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+    summary = [row[-1] for row in rows]
+    return summary, lambda index: any(
+        f"USING INDEX {index}" in detail or f"USING COVERING INDEX {index}" in detail for detail in summary
+    )
+
+
+def explain(engine, statement):
+    sql = str(statement.compile(engine, compile_kwargs={"literal_binds": True}))
+    with engine.connect() as connection:
+        if engine.dialect.name == "postgresql":
+            summary, uses_index = _postgres_plan(connection, sql)
+        else:
+            summary, uses_index = _sqlite_plan(connection, sql)
+
+        started = time.perf_counter()
+        rows = len(connection.execute(statement).all())
+        elapsed_ms = (time.perf_counter() - started) * 1000
+    return summary, uses_index, rows, elapsed_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", required=True, help="Scratch database; tables are created if missing")
+    parser.add_argument("--logs", type=int, default=10_000_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--exercises", type=int, default=1_000)
+    parser.add_argument("--plans-per-user", type=int, default=2)
+    parser.add_argument("--exercises-per-plan", type=int, default=20)
+    parser.add_argument("--skip-populate", action="store_true", help="Reuse rows from a previous run")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    if not args.database_url.startswith(("postgresql", "sqlite")):
+        parser.error("Only PostgreSQL and SQLite databases are supported")
+
+    engine = create_engine(args.database_url)
+    SQLModel.metadata.create_all(engine)
+    if not args.skip_populate:
+        print(f"Populating {args.database_url} with {args.logs} workout logs...")
+        populate(engine, args.users, args.exercises, args.logs, args.plans_per_user, args.exercises_per_plan)
+
+    results, failed = [], False
+    for name, statement, index in checked_queries(user_id=args.users // 2, plan_id=args.users // 2):
+        summary, uses_index, rows, elapsed_ms = explain(engine, statement)
+        ok = uses_index(index)
+        failed |= not ok
+        results.append({
+            "query": name, "expected_index": index, "uses_index": ok,
+            "rows": rows, "elapsed_ms": elapsed_ms, "plan": summary
+        })
+        print(f"{'OK  ' if ok else 'FAIL'} {name}: {rows} rows in {elapsed_ms:.1f} ms")
+        for line in summary:
+            print(f"       {line}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"dialect": engine.dialect.name, "logs": args.logs, "results": results}, f, indent=2)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# backend/benchmarks/server.py
+"""Run the API in a background thread for benchmarks."""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import socket
+import threading
+import time
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class BackgroundServer:
+    """Uvicorn serving app.main:app on a local port from a daemon thread
+
+    DATABASE_URL must point at the benchmark database before the app is
+    imported, so it is set here rather than by the caller.
+    """
+
+    def __init__(self, database_url: str, port: int = 0):
+        os.environ["DATABASE_URL"] = database_url
+        self.port = port or free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+
+        import uvicorn
+        from app.main import app
+
+        self.app = app
+        config = uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning", lifespan="on")
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, name="benchmark-server", daemon=True)
+
+    def __enter__(self) -> "BackgroundServer":
+        self.thread.start()
+        deadline = time.monotonic() + 30
+        while not self.server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("Benchmark server did not start within 30s")
+            time.sleep(0.05)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.should_exit = True
+        self.thread.join(timeout=10)
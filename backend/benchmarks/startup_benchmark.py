@@ -0,0 +1,91 @@
+# backend/benchmarks/startup_benchmark.py
+"""Measure API worker start-up time.
+
+Each run starts a fresh interpreter and records:
+  import_seconds      time to import app.main
+  first_response      time until GET / answers (startup hook included)
+  ready_seconds       time until GET /ready reports ready (model + index)
+
+Usage:
+    python benchmarks/startup_benchmark.py --runs 5 --output startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD_SCRIPT = r"""
+import json, sys, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+
+from fastapi.testclient import TestClient
+with TestClient(app.main.app) as client:
+    client.get("/")
+    first_response = time.perf_counter()
+    ready = None
+    deadline = first_response + float(sys.argv[1])
+    while time.perf_counter() < deadline:
+        if client.get("/ready").status_code == 200:
+            ready = time.perf_counter()
+            break
+        time.sleep(0.02)
+
+print(json.dumps({
+    "import_seconds": imported - started,
+    "first_response_seconds": first_response - started,
+    "ready_seconds": None if ready is None else ready - started,
+}))
+"""
+
+
+def run_once(database_url: str, timeout: float) -> dict:
+    env = dict(os.environ, DATABASE_URL=database_url)
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT, str(timeout)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def summarize(values):
+    values = [v for v in values if v is not None]
+    if not values:
+        return None
+    return {"median": statistics.median(values), "min": min(values), "max": max(values)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark API start-up time")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds to wait for /ready")
+    parser.add_argument("--database-url", help="database to start against (default: temporary SQLite file)")
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{os.path.join(tmp, 'startup.db')}"
+        runs = [run_once(database_url, args.timeout) for _ in range(args.runs)]
+
+    results = {
+        "runs": runs,
+        "import_seconds": summarize([r["import_seconds"] for r in runs]),
+        "first_response_seconds": summarize([r["first_response_seconds"] for r in runs]),
+        "ready_seconds": summarize([r["ready_seconds"] for r in runs]),
+    }
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
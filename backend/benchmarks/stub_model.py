@@ -0,0 +1,48 @@
+# backend/benchmarks/stub_model.py
+"""Deterministic stand-in for the SentenceTransformer model used by benchmarks.
+
+Texts are embedded by hashing their words into a fixed number of buckets, so
+similar texts get similar vectors without loading torch or downloading a model.
+"""
+import os
+import zlib
+from typing import List, Union
+
+import numpy as np
+
+STUB_MODEL_NAME = "benchmark-hashing-stub"
+
+
+class HashingEncoder:
+    """Implements the subset of SentenceTransformer.encode the app calls"""
+
+    def __init__(self, dimension: int = 384):
+        self.dimension = dimension
+
+    def _encode_one(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        for word in text.lower().split():
+            bucket = zlib.crc32(word.encode())
+            vector[bucket % self.dimension] += 1.0 if bucket & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def encode(self, texts: Union[str, List[str]], batch_size: int = 32, **kwargs) -> np.ndarray:
+        if isinstance(texts, str):
+            return self._encode_one(texts)
+        return np.stack([self._encode_one(text) for text in texts]) if texts else np.zeros((0, self.dimension), np.float32)
+
+
+def configure_stub_environment(cache_dir: str):
+    """Must run before app modules are imported so stub vectors never mix with real ones"""
+    os.environ["EMBEDDING_MODEL"] = STUB_MODEL_NAME
+    os.environ["QUERY_EMBEDDING_CACHE_PATH"] = os.path.join(cache_dir, "query_embeddings.sqlite3")
+
+
+def install_stub_model():
+    """Replace the embedding service's model with the hashing encoder"""
+    from app.embeddings import embedding_service
+
+    embedding_service._model = HashingEncoder()
+    embedding_service.model_state = "ready"
+    embedding_service.model_load_seconds = 0.0
@@ -0,0 +1,125 @@
+# backend/bulk_plans.py
+"""Generate workout plans for a whole cohort from a JSONL file of preference sets.
+
+Usage:
+    python bulk_plans.py cohort.jsonl --output plans.jsonl --batch-size 1000
+    python bulk_plans.py cohort.jsonl --output plans.jsonl --save
+
+Each line holds the fields of a plan request (focus_areas, available_equipment,
+workout_type, user_level, days_per_week, session_duration and optionally
+difficulty and strict). With --save, lines that also carry an "email" have
+their plan saved to that user's account. Each output line is the generated
+plan, or {"line": n, "error": ...} for a line that failed.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict, List, Tuple
+
+from pydantic import ValidationError
+from sqlmodel import select
+from app.database import create_db_and_tables, async_engine, async_session_factory
+from app.models import User
+from app.schemas import WorkoutPlanCreate
+from app.planner import planner_service
+from app.plan_store import insert_workout_plans
+
+
+def read_batches(path: str, batch_size: int):
+    """Yield lists of (line number, email, preferences or error message)"""
+    batch = []
+    with open(path) as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                email = record.pop("email", None)
+                batch.append((line_number, email, WorkoutPlanCreate(**record).model_dump()))
+            except (json.JSONDecodeError, ValidationError, TypeError) as e:
+                batch.append((line_number, None, f"Invalid preference set: {e}"))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+async def save_plans(plans_by_email: Dict[str, List[dict]]) -> Tuple[int, List[str]]:
+    """Save plans to their users' accounts in one transaction; returns (saved, unknown emails)"""
+    async with async_session_factory() as session:
+        users = (await session.exec(select(User.email, User.id).where(User.email.in_(list(plans_by_email))))).all()
+        user_ids = dict(users)
+        saved = 0
+        for email, plans in plans_by_email.items():
+            if email in user_ids:
+                plan_ids = await insert_workout_plans(session, user_ids[email], plans)
+                for plan, plan_id in zip(plans, plan_ids):
+                    plan["id"] = plan_id
+                saved += len(plans)
+        await session.commit()
+    # Each batch saves under its own asyncio.run(); pooled asyncpg connections are
+    # bound to the loop that opened them, so close them before this loop goes away
+    await async_engine.dispose()
+    return saved, sorted(set(plans_by_email) - set(user_ids))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate workout plans for many preference sets")
+    parser.add_argument("path", help="JSONL file with one preference set per line")
+    parser.add_argument("--output", required=True, help="JSONL file to write the plans to")
+    parser.add_argument("--batch-size", type=int, default=1000,
+                        help="preference sets encoded and scored together")
+    parser.add_argument("--save", action="store_true", help="save plans for lines with an email to that user")
+    args = parser.parse_args()
+
+    create_db_and_tables()
+
+    totals = {"generated": 0, "failed": 0, "saved": 0}
+    unknown_emails = set()
+    started = time.perf_counter()
+
+    with open(args.output, "w") as out:
+        for batch in read_batches(args.path, args.batch_size):
+            valid = [(line, email, prefs) for line, email, prefs in batch if isinstance(prefs, dict)]
+            plans = planner_service.create_workout_plans([prefs for _, _, prefs in valid])
+            results = dict(zip([line for line, _, _ in valid], plans))
+
+            if args.save:
+                plans_by_email: Dict[str, List[dict]] = {}
+                for (line, email, _), plan in zip(valid, plans):
+                    if email and "error" not in plan:
+                        plans_by_email.setdefault(email, []).append(plan)
+                if plans_by_email:
+                    saved, unknown = asyncio.run(save_plans(plans_by_email))
+                    totals["saved"] += saved
+                    unknown_emails.update(unknown)
+
+            for line, _, prefs in batch:
+                plan = results.get(line, {"error": prefs})
+                if "error" in plan:
+                    totals["failed"] += 1
+                    out.write(json.dumps({"line": line, "error": plan["error"]}) + "\n")
+                else:
+                    totals["generated"] += 1
+                    out.write(json.dumps({"line": line, **plan}, default=str) + "\n")
+
+            elapsed = time.perf_counter() - started
+            print(f"{totals['generated'] + totals['failed']} preference sets processed "
+                  f"({totals['generated'] / max(elapsed, 1e-9):.0f} plans/s)")
+
+    elapsed = time.perf_counter() - started
+    print(f"Done in {elapsed:.1f}s: {totals['generated']} generated, {totals['failed']} failed, "
+          f"{totals['saved']} saved")
+    if unknown_emails:
+        print(f"No account found for {len(unknown_emails)} emails, their plans were not saved: "
+              f"{', '.join(sorted(unknown_emails)[:10])}")
+
+
+if __name__ == "__main__":
+    main()
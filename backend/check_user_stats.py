@@ -0,0 +1,70 @@
+# backend/check_user_stats.py
+"""Verify the per-user lifetime stats against the workout logs.
+
+Usage:
+    python check_user_stats.py             # report users whose stats drifted
+    python check_user_stats.py --rebuild   # also rewrite the drifted stats
+
+Users are processed in id order in batches, one transaction per batch.
+--rebuild recomputes each drifted batch while holding its users' row locks,
+so it is safe to run against a live API: log writes for those users wait
+for the batch to commit.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+
+from sqlmodel import Session, select
+from app.database import engine
+from app.models import User, UserStats
+from app.aggregates import compute_user_stats, user_stats_as_dict, rebuild_user_stats
+
+
+def check_user_stats(rebuild: bool = False, batch_size: int = 500) -> int:
+    """Compare stored stats with recomputed ones and return the number of mismatches"""
+    mismatches = 0
+    checked = 0
+    last_id = 0
+    with Session(engine) as session:
+        while True:
+            user_ids = list(session.exec(
+                select(User.id).where(User.id > last_id).order_by(User.id).limit(batch_size)
+            ).all())
+            if not user_ids:
+                break
+
+            computed = compute_user_stats(session, user_ids)
+            stored = {
+                stats.user_id: user_stats_as_dict(stats)
+                for stats in session.exec(select(UserStats).where(UserStats.user_id.in_(user_ids))).all()
+            }
+
+            drifted = [
+                user_id for user_id in user_ids
+                if computed.get(user_id) != stored.get(user_id)
+            ]
+            for user_id in drifted:
+                print(f"User {user_id}: stored {stored.get(user_id)} != computed {computed.get(user_id)}")
+
+            if drifted and rebuild:
+                rebuild_user_stats(session, drifted)
+                session.commit()
+
+            mismatches += len(drifted)
+            checked += len(user_ids)
+            last_id = user_ids[-1]
+
+    action = "rebuilt" if rebuild else "found"
+    print(f"Checked {checked} users, {action} {mismatches} inconsistent stats records.")
+    return mismatches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check and rebuild per-user lifetime stats")
+    parser.add_argument("--rebuild", action="store_true", help="rewrite stats that do not match the logs")
+    parser.add_argument("--batch-size", type=int, default=500, help="users per transaction")
+    args = parser.parse_args()
+    mismatches = check_user_stats(args.rebuild, args.batch_size)
+    sys.exit(1 if mismatches and not args.rebuild else 0)
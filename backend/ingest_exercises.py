@@ -0,0 +1,88 @@
+# backend/ingest_exercises.py
+"""Stream an exercise catalog from CSV or JSONL into the database.
+
+Usage:
+    python ingest_exercises.py exercises.jsonl --batch-size 256 --chunk-size 2000
+
+Each record needs: name, description, target_muscle, equipment, difficulty,
+instructions. Exercises are upserted by name, so re-running a file is safe.
+Progress is checkpointed after every committed chunk; an interrupted run
+resumes from the checkpoint unless --restart is given.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import logging
+import time
+
+from sqlmodel import Session
+from app.database import engine, create_db_and_tables
+from app.ingestion import ingest_exercises, read_exercise_file, DEFAULT_ENCODE_BATCH_SIZE, DEFAULT_CHUNK_SIZE
+
+
+def _source_fingerprint(path: str) -> dict:
+    stat = os.stat(path)
+    return {"path": os.path.abspath(path), "size": stat.st_size, "mtime": stat.st_mtime}
+
+
+def load_checkpoint(checkpoint_path: str, source_path: str) -> int:
+    """Return the number of records already ingested from this exact source file"""
+    if not os.path.exists(checkpoint_path):
+        return 0
+    with open(checkpoint_path) as f:
+        checkpoint = json.load(f)
+    if checkpoint.get("source") != _source_fingerprint(source_path):
+        print(f"Checkpoint {checkpoint_path} belongs to a different or modified file, starting over.")
+        return 0
+    return int(checkpoint.get("records", 0))
+
+
+def save_checkpoint(checkpoint_path: str, source_path: str, records: int):
+    tmp_path = f"{checkpoint_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"source": _source_fingerprint(source_path), "records": records}, f)
+    os.replace(tmp_path, checkpoint_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest exercises from a CSV or JSONL file")
+    parser.add_argument("path", help="CSV or JSONL file with exercise records")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_ENCODE_BATCH_SIZE,
+                        help="number of exercises per model.encode batch")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="number of records committed per transaction")
+    parser.add_argument("--checkpoint", help="checkpoint file (default: <path>.checkpoint.json)")
+    parser.add_argument("--restart", action="store_true", help="ignore any existing checkpoint")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    checkpoint_path = args.checkpoint or f"{args.path}.checkpoint.json"
+    skip = 0 if args.restart else load_checkpoint(checkpoint_path, args.path)
+    if skip:
+        print(f"Resuming after {skip} already ingested records.")
+
+    create_db_and_tables()
+    started = time.perf_counter()
+    with Session(engine) as session:
+        totals = ingest_exercises(
+            session,
+            read_exercise_file(args.path),
+            batch_size=args.batch_size,
+            chunk_size=args.chunk_size,
+            skip=skip,
+            on_chunk=lambda consumed: save_checkpoint(checkpoint_path, args.path, consumed)
+        )
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"Done in {elapsed:.1f}s: {totals['inserted']} inserted, {totals['updated']} updated, "
+        f"{totals['invalid']} invalid records skipped."
+    )
+
+
+if __name__ == "__main__":
+    main()
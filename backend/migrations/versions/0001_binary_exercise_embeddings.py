@@ -0,0 +1,103 @@
+"""Store exercise embeddings as raw float32 bytes with a model tag
+
+Converts the JSON text ``exercise.embedding`` column into a binary column
+holding little-endian float32 bytes and adds ``exercise.embedding_model``.
+Rows are converted in batches keyed on the primary key so the migration
+runs in bounded memory on large catalogs.
+
+Revision ID: 0001
+Revises:
+Create Date: 2025-08-10
+"""
+import os
+
+from alembic import op
+import numpy as np
+import sqlalchemy as sa
+
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = int(os.getenv("MIGRATION_BATCH_SIZE", "1000"))
+# Existing JSON embeddings were produced by the default model
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+
+
+def _exercise_table(source_type, target_type):
+    return sa.table(
+        'exercise',
+        sa.column('id', sa.Integer),
+        sa.column('embedding', source_type),
+        sa.column('embedding_converted', target_type),
+        sa.column('embedding_model', sa.String),
+    )
+
+
+def _convert_in_batches(exercise, convert, model_name):
+    bind = op.get_bind()
+    update = (
+        exercise.update()
+        .where(exercise.c.id == sa.bindparam('b_id'))
+        .values(embedding_converted=sa.bindparam('b_value'), embedding_model=sa.bindparam('b_model'))
+    )
+
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(exercise.c.id, exercise.c.embedding)
+            .where(exercise.c.id > last_id)
+            .order_by(exercise.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+
+        params = []
+        for row in rows:
+            value = convert(row.embedding) if row.embedding else None
+            params.append({'b_id': row.id, 'b_value': value, 'b_model': model_name if value else None})
+        bind.execute(update, params)
+        last_id = rows[-1].id
+
+
+def _json_to_bytes(text):
+    text = text.strip()
+    if len(text) < 2 or text[0] != '[' or text[-1] != ']':
+        return None
+    vector = np.fromstring(text[1:-1], dtype='<f4', sep=',')
+    return vector.tobytes() if vector.size else None
+
+
+def _bytes_to_json(data):
+    vector = np.frombuffer(data, dtype='<f4')
+    return '[' + ', '.join(repr(float(value)) for value in vector) + ']'
+
+
+def upgrade():
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('exercise')}
+    if 'embedding_model' in columns:
+        # Table was created by SQLModel.metadata.create_all with the binary schema already
+        return
+
+    op.add_column('exercise', sa.Column('embedding_converted', sa.LargeBinary(), nullable=True))
+    op.add_column('exercise', sa.Column('embedding_model', sa.String(), nullable=True))
+
+    _convert_in_batches(_exercise_table(sa.Text, sa.LargeBinary), _json_to_bytes, EMBEDDING_MODEL_NAME)
+
+    with op.batch_alter_table('exercise') as batch_op:
+        batch_op.drop_column('embedding')
+        batch_op.alter_column('embedding_converted', new_column_name='embedding')
+
+
+def downgrade():
+    op.add_column('exercise', sa.Column('embedding_converted', sa.String(), nullable=True))
+
+    _convert_in_batches(_exercise_table(sa.LargeBinary, sa.String), _bytes_to_json, None)
+
+    with op.batch_alter_table('exercise') as batch_op:
+        batch_op.drop_column('embedding')
+        batch_op.drop_column('embedding_model')
+        batch_op.alter_column('embedding_converted', new_column_name='embedding')
@@ -0,0 +1,38 @@
+"""Add per-user daily workout and muscle-group rollup tables
+
+Populate them for existing logs with ``python backfill_rollups.py``.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2025-08-12
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'dailyworkoutrollup',
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('user.id'), primary_key=True),
+        sa.Column('day', sa.Date(), primary_key=True),
+        sa.Column('workouts_count', sa.Integer(), nullable=False),
+        sa.Column('total_duration', sa.Integer(), nullable=False),
+    )
+    op.create_table(
+        'dailymusclerollup',
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('user.id'), primary_key=True),
+        sa.Column('day', sa.Date(), primary_key=True),
+        sa.Column('muscle_group', sa.String(), primary_key=True),
+        sa.Column('workouts_count', sa.Integer(), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table('dailymusclerollup')
+    op.drop_table('dailyworkoutrollup')
@@ -0,0 +1,32 @@
+"""Add per-user lifetime stats table
+
+Populate it for existing logs with ``python check_user_stats.py --rebuild``.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2025-08-13
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'userstats',
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('user.id'), primary_key=True),
+        sa.Column('total_workouts', sa.Integer(), nullable=False),
+        sa.Column('total_seconds', sa.Integer(), nullable=False),
+        sa.Column('total_minutes', sa.Integer(), nullable=False),
+        sa.Column('first_workout_at', sa.DateTime(), nullable=True),
+        sa.Column('muscle_group_counts', sa.String(), nullable=True),
+    )
+
+
+def downgrade():
+    op.drop_table('userstats')
@@ -0,0 +1,25 @@
+"""Add composite indexes for per-user log and per-plan exercise lookups
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2025-08-20
+"""
+from alembic import op
+
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_workoutlog_user_completed_at', 'workoutlog', ['user_id', 'completed_at'])
+    op.create_index(
+        'ix_workoutplanexercise_plan_day_order', 'workoutplanexercise', ['workout_plan_id', 'day', 'order']
+    )
+
+
+def downgrade():
+    op.drop_index('ix_workoutplanexercise_plan_day_order', table_name='workoutplanexercise')
+    op.drop_index('ix_workoutlog_user_completed_at', table_name='workoutlog')
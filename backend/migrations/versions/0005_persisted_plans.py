@@ -0,0 +1,27 @@
+"""Allow timed plan exercises without reps and index plans per user
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2025-08-27
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('workoutplanexercise') as batch_op:
+        batch_op.alter_column('reps', existing_type=sa.Integer(), nullable=True)
+    op.create_index('ix_workoutplan_user_created_at', 'workoutplan', ['user_id', 'created_at'])
+
+
+def downgrade():
+    op.drop_index('ix_workoutplan_user_created_at', table_name='workoutplan')
+    op.execute('UPDATE workoutplanexercise SET reps = 0 WHERE reps IS NULL')
+    with op.batch_alter_table('workoutplanexercise') as batch_op:
+        batch_op.alter_column('reps', existing_type=sa.Integer(), nullable=False)
@@ -0,0 +1,27 @@
+"""Extend the per-user log indexes with id for keyset pagination
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2025-09-03
+"""
+from alembic import op
+
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.drop_index('ix_workoutlog_user_completed_at', table_name='workoutlog')
+    op.create_index('ix_workoutlog_user_completed_at', 'workoutlog', ['user_id', 'completed_at', 'id'])
+    op.create_index(
+        'ix_workoutlog_user_exercise_completed_at', 'workoutlog', ['user_id', 'exercise_id', 'completed_at', 'id']
+    )
+
+
+def downgrade():
+    op.drop_index('ix_workoutlog_user_exercise_completed_at', table_name='workoutlog')
+    op.drop_index('ix_workoutlog_user_completed_at', table_name='workoutlog')
+    op.create_index('ix_workoutlog_user_completed_at', 'workoutlog', ['user_id', 'completed_at'])
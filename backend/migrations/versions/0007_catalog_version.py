@@ -0,0 +1,27 @@
+"""Add a catalog version row bumped by every exercise catalog write
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2025-09-05
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    catalogversion = op.create_table(
+        'catalogversion',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('version', sa.Integer(), nullable=False),
+    )
+    op.bulk_insert(catalogversion, [{'id': 1, 'version': 0}])
+
+
+def downgrade():
+    op.drop_table('catalogversion')
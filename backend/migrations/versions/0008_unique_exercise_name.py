@@ -0,0 +1,37 @@
+"""Make exercise names unique so ingestion can upsert on them
+
+Duplicate names are merged into the lowest id first; logs and plan
+exercises that pointed at a duplicate are moved to the kept row.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2025-09-08
+"""
+from alembic import op
+
+
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+KEPT_IDS = 'SELECT MIN(id) FROM exercise GROUP BY name'
+KEPT_ID_FOR = (
+    '(SELECT MIN(kept.id) FROM exercise kept WHERE kept.name = '
+    '(SELECT duplicate.name FROM exercise duplicate WHERE duplicate.id = {table}.exercise_id))'
+)
+
+
+def upgrade():
+    for table in ('workoutlog', 'workoutplanexercise'):
+        op.execute(
+            f'UPDATE {table} SET exercise_id = {KEPT_ID_FOR.format(table=table)} '
+            f'WHERE exercise_id NOT IN ({KEPT_IDS})'
+        )
+    op.execute(f'DELETE FROM exercise WHERE id NOT IN ({KEPT_IDS})')
+    op.execute('UPDATE catalogversion SET version = version + 1')
+    op.create_index('ix_exercise_name', 'exercise', ['name'], unique=True)
+
+
+def downgrade():
+    op.drop_index('ix_exercise_name', table_name='exercise')
@@ -3,11 +3,10 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from sqlmodel import Session, select
+from sqlmodel import Session, select, func
 from app.database import engine
 from app.models import Exercise
-from app.embeddings import embedding_service
-import json
+from app.ingestion import ingest_exercises
 
 SAMPLE_EXERCISES = [
     {
@@ -96,36 +95,17 @@ def seed_exercises():
     """Seed the database with sample exercises"""
     with Session(engine) as session:
         # Check if exercises already exist
-        statement = select(Exercise)
-        existing_exercises = session.exec(statement).all()
+        exercise_count = session.exec(select(func.count(Exercise.id))).one()
         
-        if existing_exercises:
-            print(f"Database already has {len(existing_exercises)} exercises. Skipping seed.")
+        if exercise_count:
+            print(f"Database already has {exercise_count} exercises. Skipping seed.")
             return
         
         print("Seeding database with sample exercises...")
         
-        for exercise_data in SAMPLE_EXERCISES:
-            # Create embedding for the exercise
-            embedding = embedding_service.create_exercise_embedding(exercise_data)
-            embedding_json = json.dumps(embedding) if embedding else None
-            
-            # Create Exercise object
-            exercise = Exercise(
-                name=exercise_data["name"],
-                description=exercise_data["description"],
-                target_muscle=exercise_data["target_muscle"],
-                equipment=exercise_data["equipment"],
-                difficulty=exercise_data["difficulty"],
-                instructions=exercise_data["instructions"],
-                embedding=embedding_json
-            )
-            
-            session.add(exercise)
-            print(f"Added exercise: {exercise.name}")
+        totals = ingest_exercises(session, SAMPLE_EXERCISES)
         
-        session.commit()
-        print(f"Successfully seeded {len(SAMPLE_EXERCISES)} exercises!")
+        print(f"Successfully seeded {totals['inserted']} exercises!")
 
 if __name__ == "__main__":
     seed_exercises()
\ No newline at end of file
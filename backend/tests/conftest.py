@@ -0,0 +1,78 @@
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_model import configure_stub_environment, install_stub_model
+
+# Keep tests off any real database configured in .env: every run gets a scratch
+# SQLite file (shared by the sync and async engines) and the hashing stub model
+_scratch = tempfile.mkdtemp(prefix="workout-planner-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_scratch, 'test.db')}"
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+configure_stub_environment(_scratch)
+
+import pytest
+
+
+@pytest.fixture
+def db():
+    """Fresh tables and caches for one test; yields the sync engine"""
+    from sqlmodel import SQLModel
+    import app.models  # noqa: F401  (registers the tables)
+    from app.database import engine
+    from app.exercise_index import exercise_index
+    from app.planner import plan_cache
+    from app.auth.cache import token_cache, user_cache
+
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    install_stub_model()
+    exercise_index.invalidate()
+    for cache in (plan_cache, token_cache, user_cache):
+        cache.clear()
+    yield engine
+
+
+@pytest.fixture
+def session(db):
+    from sqlmodel import Session
+
+    with Session(db) as session:
+        yield session
+
+
+@pytest.fixture
+def client(db):
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    return TestClient(app)
+
+
+@pytest.fixture
+def auth_headers(client):
+    """Headers for a freshly registered user"""
+    credentials = {"email": "tester@example.com", "password": "test-password"}
+    client.post("/api/auth/register", json={**credentials, "full_name": "Tester"})
+    token = client.post("/api/auth/login", json=credentials).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def exercise_records(count: int):
+    """Synthetic catalog with every muscle, equipment and difficulty combination represented"""
+    muscles = ["chest", "back", "legs", "shoulders", "arms", "core"]
+    equipment = ["bodyweight", "dumbbells", "barbell", "kettlebell"]
+    levels = ["beginner", "intermediate", "advanced"]
+    return [
+        {
+            "name": f"Exercise {i}",
+            "description": f"{muscles[i % 6]} movement number {i} with {equipment[(i // 6) % 4]}",
+            "target_muscle": muscles[i % 6],
+            "equipment": equipment[(i // 6) % 4],
+            "difficulty": levels[(i // 24) % 3],
+            "instructions": "Move with control"
+        }
+        for i in range(count)
+    ]
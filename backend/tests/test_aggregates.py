@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta
+
+from sqlmodel import select
+
+from app.aggregates import apply_workout_logs, compute_user_stats, rebuild_daily_rollups, user_stats_as_dict
+from app.ingestion import ingest_exercises
+from app.models import DailyMuscleRollup, DailyWorkoutRollup, Exercise, User, UserStats, WorkoutLog
+from check_user_stats import check_user_stats
+from conftest import exercise_records
+
+
+def _log_workouts(client, auth_headers, session):
+    """Log a mix of single and batch writes today plus older logs; returns the user's id"""
+    ingest_exercises(session, exercise_records(12))
+    exercises = session.exec(select(Exercise).order_by(Exercise.id)).all()
+    user = session.exec(select(User).where(User.email == "tester@example.com")).one()
+
+    for n, exercise in enumerate(exercises[:4]):
+        response = client.post("/api/progress/log", headers=auth_headers, json={
+            "exercise_id": exercise.id, "sets_completed": 3, "reps_completed": 10, "duration_completed": 90 * n
+        })
+        assert response.status_code == 200
+    response = client.post("/api/progress/log/batch", headers=auth_headers, json={"entries": [
+        {"exercise_id": exercise.id, "sets_completed": 2, "reps_completed": 8, "duration_completed": 45}
+        for exercise in exercises[2:9]
+    ]})
+    assert response.json()["logged"] == 7
+
+    # Earlier days go through the same incremental path the routes use
+    for days_ago, exercise in [(1, exercises[0]), (1, exercises[6]), (3, exercises[1])]:
+        log = WorkoutLog(user_id=user.id, exercise_id=exercise.id, sets_completed=1, reps_completed=5,
+                         duration_completed=600, completed_at=datetime.utcnow() - timedelta(days=days_ago))
+        session.add(log)
+        apply_workout_logs(session, [(log, exercise.target_muscle)])
+    session.commit()
+    return user.id
+
+
+def _rollups(session, user_id):
+    session.expire_all()
+    days = {
+        (r.day, r.workouts_count, r.total_duration)
+        for r in session.exec(select(DailyWorkoutRollup).where(DailyWorkoutRollup.user_id == user_id))
+    }
+    muscles = {
+        (r.day, r.muscle_group, r.workouts_count)
+        for r in session.exec(select(DailyMuscleRollup).where(DailyMuscleRollup.user_id == user_id))
+    }
+    return days, muscles
+
+
+def test_daily_rollups_match_a_rebuild_from_the_logs(client, auth_headers, session):
+    user_id = _log_workouts(client, auth_headers, session)
+    maintained = _rollups(session, user_id)
+    assert len(maintained[0]) == 3
+
+    rebuild_daily_rollups(session, [user_id])
+    session.commit()
+    assert _rollups(session, user_id) == maintained
+
+    history = client.get("/api/progress/history?days=7", headers=auth_headers).json()
+    assert [day["workouts_count"] for day in history] == [1, 2, 11]
+    assert sum(day["total_duration"] for day in history) == 90 * 6 + 45 * 7 + 600 * 3
+
+
+def test_user_stats_match_a_recompute_and_rebuild_repairs_drift(client, auth_headers, session):
+    user_id = _log_workouts(client, auth_headers, session)
+    computed = compute_user_stats(session, [user_id])[user_id]
+    assert computed["total_workouts"] == 14
+    assert user_stats_as_dict(session.get(UserStats, user_id)) == computed
+    assert check_user_stats() == 0
+
+    stats = client.get("/api/progress/stats", headers=auth_headers).json()
+    assert stats["total_workouts"] == 14
+    assert stats["total_time_minutes"] == computed["total_minutes"]
+    assert sorted(stats["muscle_groups_trained"]) == sorted(computed["muscle_group_counts"])
+
+    drifted = session.get(UserStats, user_id)
+    drifted.total_workouts += 5
+    drifted.muscle_group_counts = "{}"
+    session.add(drifted)
+    session.commit()
+
+    assert check_user_stats() == 1
+    assert check_user_stats(rebuild=True) == 1
+    session.expire_all()
+    assert user_stats_as_dict(session.get(UserStats, user_id)) == computed
+    assert check_user_stats() == 0
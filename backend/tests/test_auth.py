@@ -0,0 +1,86 @@
+import asyncio
+import threading
+import time
+from datetime import timedelta
+
+import pytest
+from jose import jwt
+
+from app.auth import utils
+from app.auth.cache import token_cache
+from app.auth.utils import ALGORITHM, SECRET_KEY, auth_pool, authenticate_user, create_access_token, verify_token
+from app.models import User
+
+
+class _Result:
+    def __init__(self, user):
+        self._user = user
+
+    def first(self):
+        return self._user
+
+
+class _Session:
+    def __init__(self, user):
+        self._user = user
+
+    async def exec(self, statement):
+        return _Result(self._user)
+
+
+def test_aborted_logins_do_not_starve_auth_pool(monkeypatch):
+    release = threading.Event()
+
+    def slow_verify(password, hashed_password):
+        release.wait(5)
+        return False, None
+
+    monkeypatch.setattr(utils.pwd_context, "verify_and_update", slow_verify)
+    session = _Session(User(id=1, email="storm@example.com", full_name="Storm", hashed_password="x"))
+
+    async def storm():
+        # More logins than there are workers, so some are still queued when the clients go away
+        logins = [
+            asyncio.create_task(authenticate_user(session, "storm@example.com", "secret"))
+            for _ in range(auth_pool.max_workers + 3)
+        ]
+        await asyncio.sleep(0.05)
+        for login in logins:
+            login.cancel()
+        await asyncio.gather(*logins, return_exceptions=True)
+
+    asyncio.run(storm())
+    release.set()
+
+    deadline = time.monotonic() + 5
+    while auth_pool.stats()["in_flight"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert auth_pool.stats()["in_flight"] == 0
+
+
+@pytest.fixture
+def pinned_timezone(monkeypatch):
+    def pin(zone):
+        monkeypatch.setenv("TZ", zone)
+        time.tzset()
+    yield pin
+    monkeypatch.undo()
+    time.tzset()
+
+
+@pytest.mark.parametrize("zone", ["Asia/Tokyo", "America/Los_Angeles"])
+def test_token_cache_ttl_ignores_host_timezone(pinned_timezone, zone):
+    pinned_timezone(zone)
+    token = create_access_token({"sub": "tz@example.com"}, expires_delta=timedelta(seconds=60))
+    token_cache.pop(token)
+
+    assert verify_token(token) == "tz@example.com"
+    expires_at, _ = token_cache._entries[token]
+    assert 0 < expires_at - time.monotonic() <= 60
+
+
+def test_token_without_expiry_is_not_cached():
+    token = jwt.encode({"sub": "noexp@example.com"}, SECRET_KEY, algorithm=ALGORITHM)
+
+    assert verify_token(token) == "noexp@example.com"
+    assert token_cache.get(token) is None
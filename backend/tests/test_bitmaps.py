@@ -0,0 +1,61 @@
+import random
+
+import numpy as np
+import pytest
+
+from app.bitmaps import count, pack, unpack
+from app.exercise_index import IndexSnapshot
+
+MUSCLES = ["chest", "Back", "legs", "shoulders", "arms", "core"]
+EQUIPMENT = ["bodyweight", "Dumbbells", "barbell", "kettlebell", "resistance bands"]
+LEVELS = ["beginner", "intermediate", "Advanced"]
+
+
+def _snapshot(n_rows: int, rng: random.Random) -> IndexSnapshot:
+    records = [
+        {
+            "id": i + 1, "name": f"Exercise {i}", "description": "", "target_muscle": rng.choice(MUSCLES),
+            "equipment": rng.choice(EQUIPMENT), "difficulty": rng.choice(LEVELS)
+        }
+        for i in range(n_rows)
+    ]
+    matrix = np.zeros((n_rows, 4), dtype=np.float32)
+    return IndexSnapshot(records, matrix, np.zeros(n_rows, dtype=bool), version=1)
+
+
+def _naive(records, equipment, target_muscles, difficulties):
+    def matches(value, wanted):
+        return wanted is None or value.lower() in {w.lower() for w in wanted}
+
+    return np.array([
+        matches(r["equipment"], equipment) and matches(r["target_muscle"], target_muscles)
+        and matches(r["difficulty"], difficulties)
+        for r in records
+    ], dtype=bool)
+
+
+def _filter(values, rng):
+    # None skips the filter; lists may be empty, repeat values, vary case or name unknown values
+    if rng.random() < 0.25:
+        return None
+    picked = rng.sample(values + ["unknown"], rng.randint(0, 3))
+    return [value.upper() if rng.random() < 0.3 else value for value in picked + picked[:1]]
+
+
+@pytest.mark.parametrize("n_rows", [0, 1, 63, 64, 65, 1000])
+def test_filter_bitmap_matches_a_naive_filter(n_rows):
+    rng = random.Random(n_rows)
+    index = _snapshot(n_rows, rng)
+    for _ in range(200):
+        filters = (_filter(EQUIPMENT, rng), _filter(MUSCLES, rng), _filter(LEVELS, rng))
+        bitmap = index.filter_bitmap(*filters)
+        expected = _naive(index.records, *filters)
+        assert np.array_equal(index.to_mask(bitmap), expected)
+        assert count(bitmap) == int(expected.sum())
+
+
+def test_pack_round_trips():
+    rng = np.random.default_rng(0)
+    for n_rows in [0, 1, 64, 129]:
+        mask = rng.random(n_rows) < 0.5
+        assert np.array_equal(unpack(pack(mask), n_rows), mask)
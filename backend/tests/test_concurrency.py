@@ -0,0 +1,30 @@
+import asyncio
+import threading
+
+from app.concurrency import BoundedExecutor
+
+
+def test_cancelled_queued_calls_release_their_slots():
+    pool = BoundedExecutor("test-cancel", max_workers=1, max_queue=2)
+    started, release = threading.Event(), threading.Event()
+
+    def blocking():
+        started.set()
+        release.wait(5)
+        return "done"
+
+    async def scenario():
+        running = asyncio.create_task(pool.run(blocking))
+        queued = [asyncio.create_task(pool.run(blocking)) for _ in range(2)]
+        await asyncio.sleep(0)
+        assert await asyncio.to_thread(started.wait, 5)
+        assert pool.stats()["in_flight"] == 3
+
+        for task in queued:
+            task.cancel()
+        await asyncio.gather(*queued, return_exceptions=True)
+        release.set()
+        assert await running == "done"
+
+    asyncio.run(scenario())
+    assert pool.stats()["in_flight"] == 0
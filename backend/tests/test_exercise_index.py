@@ -0,0 +1,29 @@
+from sqlmodel import select
+
+from app.exercise_index import bump_catalog_version, exercise_index
+from app.ingestion import ingest_exercises
+from app.models import CatalogVersion, Exercise
+from conftest import exercise_records
+
+
+def test_catalog_version_row_is_created_then_bumped(session):
+    assert session.get(CatalogVersion, 1) is None
+    for _ in range(3):
+        bump_catalog_version(session.connection())
+    session.commit()
+
+    assert session.get(CatalogVersion, 1).version == 3
+
+
+def test_catalog_writes_change_the_stamp(session):
+    ingest_exercises(session, exercise_records(6))
+    stamp = exercise_index._read_stamp(session)
+
+    exercise = session.exec(select(Exercise)).first()
+    exercise.instructions = "edited in place"
+    session.add(exercise)
+    session.commit()
+
+    changed = exercise_index._read_stamp(session)
+    assert changed[:2] == stamp[:2]
+    assert changed != stamp
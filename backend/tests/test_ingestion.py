@@ -0,0 +1,58 @@
+import pytest
+from sqlmodel import select
+
+from app.embeddings import embedding_service
+from app.ingestion import EmbeddingFailedError, ingest_exercises
+from app.models import Exercise
+from conftest import exercise_records
+
+
+def _embeddings(session):
+    return dict(session.exec(select(Exercise.name, Exercise.embedding)).all())
+
+
+def test_encode_failure_aborts_the_chunk_and_keeps_vectors(session, monkeypatch):
+    records = exercise_records(10)
+    ingest_exercises(session, records)
+    before = _embeddings(session)
+    assert all(before.values())
+
+    def broken_encode(texts, batch_size=32, **kwargs):
+        raise RuntimeError("out of memory")
+
+    monkeypatch.setattr(embedding_service._model, "encode", broken_encode)
+    edited = [{**record, "description": "edited"} for record in records]
+    with pytest.raises(EmbeddingFailedError):
+        ingest_exercises(session, edited)
+    session.rollback()
+
+    assert _embeddings(session) == before
+    assert not session.exec(select(Exercise).where(Exercise.description == "edited")).all()
+
+
+def test_missing_model_updates_metadata_without_clearing_vectors(session, monkeypatch):
+    records = exercise_records(10)
+    ingest_exercises(session, records)
+    before = _embeddings(session)
+
+    monkeypatch.setattr(embedding_service, "_model", None)
+    monkeypatch.setattr(embedding_service, "model_state", "failed")
+    totals = ingest_exercises(session, [{**record, "description": "edited"} for record in records])
+
+    assert totals["updated"] == len(records)
+    assert _embeddings(session) == before
+    assert len(session.exec(select(Exercise).where(Exercise.description == "edited")).all()) == len(records)
+
+
+def test_reingesting_upserts_by_name(session):
+    records = exercise_records(10)
+    assert ingest_exercises(session, records) == {"inserted": 10, "updated": 0, "invalid": 0}
+    ids = dict(session.exec(select(Exercise.name, Exercise.id)).all())
+
+    changed = [{**record, "description": "edited"} for record in records[:4]] + exercise_records(12)[10:]
+    assert ingest_exercises(session, changed) == {"inserted": 2, "updated": 4, "invalid": 0}
+
+    rows = session.exec(select(Exercise.name, Exercise.id, Exercise.description)).all()
+    assert len(rows) == 12
+    assert all(ids[name] == exercise_id for name, exercise_id, _ in rows if name in ids)
+    assert sum(description == "edited" for _, _, description in rows) == 4
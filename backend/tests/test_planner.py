@@ -0,0 +1,84 @@
+import pytest
+from sqlmodel import select
+
+from app.exercise_index import exercise_index
+from app.ingestion import ingest_exercises
+from app.models import Exercise
+from app.planner import plan_cache, planner_service
+from app.vectors import decode_vector, encode_vector
+from conftest import exercise_records
+
+PREFERENCES = {
+    "focus_areas": ["chest", "back"],
+    "available_equipment": ["dumbbells", "bodyweight"],
+    "workout_type": "strength",
+    "user_level": "beginner",
+    "days_per_week": 3,
+    "session_duration": 45
+}
+
+
+def test_same_preferences_give_the_same_plan(session):
+    ingest_exercises(session, exercise_records(72))
+
+    first = planner_service.create_workout_plan(PREFERENCES, user_id=1)
+    assert "error" not in first
+    assert planner_service.create_workout_plan(PREFERENCES, user_id=1) == first
+    assert planner_service.create_workout_plan(PREFERENCES, user_id=1, use_cache=False) == first
+    assert planner_service.create_workout_plans([PREFERENCES], use_cache=False) == [first]
+
+
+def test_catalog_change_clears_cached_plans(session):
+    ingest_exercises(session, exercise_records(72))
+    planner_service.create_workout_plan(PREFERENCES, user_id=1)
+    assert planner_service.cached_plan(PREFERENCES) is not None
+
+    ingest_exercises(session, exercise_records(96))
+    exercise_index.get(session)
+    assert planner_service.cached_plan(PREFERENCES) is None
+
+    planner_service.create_workout_plan({**PREFERENCES, "days_per_week": 2}, user_id=1)
+    assert len(plan_cache) == 1
+
+
+def test_reembedding_in_place_clears_cached_plans(session):
+    ingest_exercises(session, exercise_records(72))
+    planner_service.create_workout_plan(PREFERENCES, user_id=1)
+    fingerprint = exercise_index.get(session).fingerprint
+
+    # New vectors for the same rows: no metadata, count or max id changes
+    for exercise in session.exec(select(Exercise)).all():
+        exercise.embedding = encode_vector(-decode_vector(exercise.embedding))
+        session.add(exercise)
+    session.commit()
+
+    index = exercise_index.get(session)
+    assert index.fingerprint != fingerprint
+    assert planner_service.cached_plan(PREFERENCES) is None
+
+
+def _preference_sets():
+    muscles = ["chest", "back", "legs", "shoulders", "arms", "core"]
+    equipment = ["dumbbells", "barbell", "kettlebell"]
+    levels = ["beginner", "intermediate", "advanced"]
+    return [
+        {**PREFERENCES, "focus_areas": [muscle], "available_equipment": [eq], "difficulty": [level]}
+        for muscle in muscles for eq in equipment for level in levels
+    ]
+
+
+@pytest.mark.parametrize("backend", ["exact", "ivf"])
+def test_bulk_plans_match_single_plans(session, monkeypatch, backend):
+    from app import exercise_index as index_module
+    from app.ann import ExactSearch, IVFSearch
+
+    # With IVF, a single probed list leaves the top-up short of candidates, exercising the exact fallback
+    searches = {"exact": ExactSearch, "ivf": lambda matrix: IVFSearch(matrix, n_lists=20, n_probe=1)}
+    monkeypatch.setattr(index_module, "build_search", searches[backend])
+    ingest_exercises(session, exercise_records(400))
+    assert exercise_index.get(session).search_backend.name == backend
+
+    preference_sets = _preference_sets()
+    bulk = planner_service.create_workout_plans(preference_sets, use_cache=False)
+    single = [planner_service.create_workout_plan(p, user_id=1, use_cache=False) for p in preference_sets]
+    assert bulk == single
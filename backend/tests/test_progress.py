@@ -0,0 +1,113 @@
+import json
+from datetime import datetime
+
+from sqlmodel import select
+
+from app.ingestion import ingest_exercises
+from app.models import Exercise, User, WorkoutLog
+from conftest import exercise_records
+
+
+def _add_logs(session, completed_at):
+    """Insert one log per timestamp for the test user; returns their ids in the same order"""
+    if not session.exec(select(Exercise)).first():
+        ingest_exercises(session, exercise_records(6))
+    user = session.exec(select(User).where(User.email == "tester@example.com")).one()
+    exercise = session.exec(select(Exercise)).first()
+    logs = [
+        WorkoutLog(user_id=user.id, exercise_id=exercise.id, sets_completed=3, reps_completed=10, completed_at=moment)
+        for moment in completed_at
+    ]
+    session.add_all(logs)
+    session.commit()
+    return [log.id for log in logs]
+
+
+def test_export_converts_aware_bounds_to_utc(client, auth_headers, session):
+    ids = _add_logs(session, [datetime(2026, 3, 1, 10), datetime(2026, 3, 1, 12), datetime(2026, 3, 1, 14)])
+
+    # 13:30+02:00 is 11:30 UTC and 15:30+02:00 is 13:30 UTC: only the 12:00 log is inside
+    response = client.get("/api/progress/export", headers=auth_headers, params={
+        "format": "ndjson", "start": "2026-03-01T13:30:00+02:00", "end": "2026-03-01T15:30:00+02:00"
+    })
+    assert response.status_code == 200
+    assert [json.loads(line)["id"] for line in response.text.splitlines()] == [ids[1]]
+
+
+def test_export_rejects_empty_range(client, auth_headers):
+    response = client.get("/api/progress/export", headers=auth_headers, params={
+        "start": "2026-03-01T12:00:00Z", "end": "2026-03-01T13:00:00+02:00"
+    })
+    assert response.status_code == 400
+
+
+def _all_pages(client, auth_headers, **params):
+    pages, cursor = [], None
+    while True:
+        response = client.get("/api/progress/logs", headers=auth_headers, params={**params, "cursor": cursor})
+        assert response.status_code == 200
+        page = response.json()
+        pages.append([item["id"] for item in page["items"]])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+def test_log_pages_have_no_gaps_or_duplicates_across_ties(client, auth_headers, session):
+    # Runs of identical completed_at straddle the page boundaries
+    moments = [datetime(2026, 3, 1, 10)] * 7 + [datetime(2026, 3, 1, 11)] * 5 + [datetime(2026, 3, 2, 9)]
+    ids = _add_logs(session, moments)
+
+    pages = _all_pages(client, auth_headers, limit=3)
+    assert [len(page) for page in pages] == [3, 3, 3, 3, 1]
+    listed = [log_id for page in pages for log_id in page]
+    expected = sorted(zip(moments, ids), reverse=True)
+    assert listed == [log_id for _, log_id in expected]
+
+
+def test_logs_convert_aware_bounds_to_utc(client, auth_headers, session):
+    ids = _add_logs(session, [datetime(2026, 3, 1, 10), datetime(2026, 3, 1, 12), datetime(2026, 3, 1, 14)])
+
+    pages = _all_pages(client, auth_headers, start="2026-03-01T13:30:00+02:00", end="2026-03-01T10:30:00-03:00")
+    assert pages == [[ids[1]]]
+
+
+def test_logs_reject_bad_cursor_and_empty_range(client, auth_headers):
+    for cursor in ["not-a-cursor", "W10", "WyJub3QgYSBkYXRlIiwxXQ"]:
+        response = client.get("/api/progress/logs", headers=auth_headers, params={"cursor": cursor})
+        assert response.status_code == 400
+
+    response = client.get("/api/progress/logs", headers=auth_headers, params={
+        "start": "2026-03-01T12:00:00Z", "end": "2026-03-01T13:00:00+02:00"
+    })
+    assert response.status_code == 400
+
+
+def test_batch_log_keeps_valid_entries_and_reports_invalid_ones(client, auth_headers, session):
+    ingest_exercises(session, exercise_records(3))
+    exercise_ids = list(session.exec(select(Exercise.id).order_by(Exercise.id)).all())
+    missing = max(exercise_ids) + 100
+    entries = [
+        {"exercise_id": exercise_id, "sets_completed": 3, "reps_completed": 10}
+        for exercise_id in [exercise_ids[0], missing, exercise_ids[1], missing, exercise_ids[0]]
+    ]
+
+    response = client.post("/api/progress/log/batch", headers=auth_headers, json={"entries": entries})
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["logged"], body["failed"]) == (3, 2)
+    assert [item["index"] for item in body["results"]] == [0, 1, 2, 3, 4]
+    assert [item["success"] for item in body["results"]] == [True, False, True, False, True]
+    assert {item["error"] for item in body["results"] if not item["success"]} == {"Exercise not found"}
+
+    stored = session.exec(select(WorkoutLog.id, WorkoutLog.exercise_id).order_by(WorkoutLog.id)).all()
+    logged = [(item["log"]["id"], item["log"]["exercise_id"]) for item in body["results"] if item["success"]]
+    assert [tuple(row) for row in stored] == logged
+    assert client.get("/api/progress/stats", headers=auth_headers).json()["total_workouts"] == 3
+
+
+def test_batch_log_rejects_empty_and_oversized_batches(client, auth_headers):
+    entry = {"exercise_id": 1, "sets_completed": 3, "reps_completed": 10}
+    for entries in ([], [entry] * 501):
+        response = client.post("/api/progress/log/batch", headers=auth_headers, json={"entries": entries})
+        assert response.status_code == 422
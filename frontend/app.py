@@ -1,6 +1,7 @@
 import streamlit as st
 import requests
 import json
+import time
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List
 import plotly.express as px
@@ -9,6 +10,8 @@ import pandas as pd
 
 # Configuration
 API_BASE_URL = "http://localhost:8000"
+# Seconds a read (stats, history, plans) is reused across reruns before it is fetched again
+READ_CACHE_TTL = 30
 
 # Initialize session state
 if 'token' not in st.session_state:
@@ -23,6 +26,14 @@ if 'active_tab' not in st.session_state:
 class WorkoutPlannerAPI:
     def __init__(self, base_url: str):
         self.base_url = base_url
+        # Streamlit re-runs this script on every interaction, so the pooled
+        # keep-alive session and the read cache live in the user's session state
+        if 'http_session' not in st.session_state:
+            st.session_state.http_session = requests.Session()
+        if 'api_cache' not in st.session_state:
+            st.session_state.api_cache = {}
+        self.http = st.session_state.http_session
+        self.cache = st.session_state.api_cache
         
     def _get_headers(self) -> Dict[str, str]:
         headers = {"Content-Type": "application/json"}
@@ -30,13 +41,30 @@ class WorkoutPlannerAPI:
             headers["Authorization"] = f"Bearer {st.session_state.token}"
         return headers
     
+    def _cached_get(self, path: str, params: Optional[Dict[str, Any]] = None) -> requests.Response:
+        """GET a read endpoint, reusing a successful response for READ_CACHE_TTL seconds"""
+        key = (st.session_state.token, path, tuple(sorted((params or {}).items())))
+        cached = self.cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        
+        response = self.http.get(f"{self.base_url}{path}", params=params, headers=self._get_headers())
+        if response.status_code == 200:
+            self.cache[key] = (time.monotonic() + READ_CACHE_TTL, response)
+        return response
+    
+    def _invalidate(self, path_prefix: str):
+        """Drop cached reads under path_prefix after a write that changes them"""
+        for key in [key for key in self.cache if key[1].startswith(path_prefix)]:
+            del self.cache[key]
+    
     def register(self, email: str, password: str, full_name: str) -> Dict[str, Any]:
         data = {
             "email": email,
             "password": password,
             "full_name": full_name
         }
-        response = requests.post(f"{self.base_url}/api/auth/register", json=data)
+        response = self.http.post(f"{self.base_url}/api/auth/register", json=data)
         return response.json()
     
     def login(self, email: str, password: str) -> Dict[str, Any]:
@@ -44,42 +72,73 @@ class WorkoutPlannerAPI:
             "email": email,
             "password": password
         }
-        response = requests.post(f"{self.base_url}/api/auth/login", json=data)
+        response = self.http.post(f"{self.base_url}/api/auth/login", json=data)
         if response.status_code == 200:
             return response.json()
         else:
             return {"error": response.json().get("detail", "Login failed")}
     
     def get_user_info(self) -> Dict[str, Any]:
-        response = requests.get(f"{self.base_url}/api/user/me", headers=self._get_headers())
+        response = self._cached_get("/api/user/me")
         if response.status_code == 200:
             return response.json()
         else:
             return {"error": "Failed to fetch user info"}
     
     def create_workout_plan(self, preferences: Dict[str, Any]) -> Dict[str, Any]:
-        response = requests.post(f"{self.base_url}/api/workout/plan", json=preferences, headers=self._get_headers())
+        response = self.http.post(f"{self.base_url}/api/workout/plan", json=preferences, headers=self._get_headers())
         if response.status_code == 200:
+            self._invalidate("/api/workout/plans")
             return response.json()
         else:
             return {"error": response.json().get("detail", "Failed to create workout plan")}
     
+    def get_workout_plans(self, limit: int = 20) -> List[Dict[str, Any]]:
+        response = self._cached_get("/api/workout/plans", {"limit": limit})
+        if response.status_code == 200:
+            return response.json()
+        else:
+            return []
+    
+    def get_workout_plan(self, plan_id: int) -> Dict[str, Any]:
+        response = self._cached_get(f"/api/workout/plan/{plan_id}")
+        if response.status_code == 200:
+            return response.json()
+        else:
+            return {"error": response.json().get("detail", "Failed to load workout plan")}
+    
     def log_workout(self, log_data: Dict[str, Any]) -> Dict[str, Any]:
-        response = requests.post(f"{self.base_url}/api/progress/log", json=log_data, headers=self._get_headers())
+        response = self.http.post(f"{self.base_url}/api/progress/log", json=log_data, headers=self._get_headers())
         if response.status_code == 200:
+            self._invalidate("/api/progress")
             return response.json()
         else:
             return {"error": response.json().get("detail", "Failed to log workout")}
     
+    def log_workout_batch(self, entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        response = self.http.post(f"{self.base_url}/api/progress/log/batch", json={"entries": entries}, headers=self._get_headers())
+        if response.status_code == 200:
+            self._invalidate("/api/progress")
+            return response.json()
+        else:
+            return {"error": response.json().get("detail", "Failed to log workouts")}
+    
     def get_progress_history(self, days: int = 7) -> List[Dict[str, Any]]:
-        response = requests.get(f"{self.base_url}/api/progress/history?days={days}", headers=self._get_headers())
+        response = self._cached_get("/api/progress/history", {"days": days})
         if response.status_code == 200:
             return response.json()
         else:
             return []
     
+    def get_muscle_heatmap(self, days: int = 30) -> Dict[str, Any]:
+        response = self._cached_get("/api/progress/heatmap", {"days": days})
+        if response.status_code == 200:
+            return response.json()
+        else:
+            return {"error": "Failed to fetch muscle heatmap"}
+    
     def get_progress_stats(self) -> Dict[str, Any]:
-        response = requests.get(f"{self.base_url}/api/progress/stats", headers=self._get_headers())
+        response = self._cached_get("/api/progress/stats")
         if response.status_code == 200:
             return response.json()
         else:
@@ -185,6 +244,16 @@ def show_workout_plan_generator():
                 value=60,
                 step=15
             )
+            
+            difficulty = st.multiselect(
+                "Exercise Difficulty (optional)",
+                ["beginner", "intermediate", "advanced"]
+            )
+            
+            strict = st.checkbox(
+                "Only use exercises matching my focus areas, equipment and difficulty exactly",
+                value=False
+            )
         
         submitted = st.form_submit_button("Generate Workout Plan", use_container_width=True)
         
@@ -196,7 +265,9 @@ def show_workout_plan_generator():
                     "workout_type": workout_type,
                     "user_level": user_level,
                     "days_per_week": days_per_week,
-                    "session_duration": session_duration
+                    "session_duration": session_duration,
+                    "difficulty": difficulty or None,
+                    "strict": strict
                 }
                 
                 with st.spinner("Generating your personalized workout plan..."):
@@ -212,10 +283,32 @@ def show_workout_plan_generator():
                 st.error("Please select at least one focus area and one equipment type")
 
 def show_current_plan():
+    saved_plans = api.get_workout_plans()
+    if not st.session_state.current_plan and saved_plans:
+        # Reopen the most recent saved plan instead of generating a new one
+        latest = api.get_workout_plan(saved_plans[0]["id"])
+        if "error" not in latest:
+            st.session_state.current_plan = latest
+    
     if not st.session_state.current_plan:
         st.info("No workout plan generated yet. Go to 'Create Plan' to generate one.")
         return
     
+    if len(saved_plans) > 1:
+        plan_ids = [p["id"] for p in saved_plans]
+        labels = {p["id"]: f"{p['name']} ({p['created_at'][:10]})" for p in saved_plans}
+        current_id = st.session_state.current_plan.get("id")
+        selected_id = st.selectbox(
+            "Saved plans", plan_ids,
+            index=plan_ids.index(current_id) if current_id in plan_ids else 0,
+            format_func=lambda plan_id: labels[plan_id]
+        )
+        if selected_id != current_id:
+            selected = api.get_workout_plan(selected_id)
+            if "error" not in selected:
+                st.session_state.current_plan = selected
+                st.rerun()
+    
     plan = st.session_state.current_plan
     
     st.title(f"📋 {plan['name']}")
@@ -266,6 +359,26 @@ def show_current_plan():
                         show_log_workout_form(exercise, day_plan['day'])
                 
                 st.markdown("---")
+            
+            if st.button("✅ Log Entire Day", key=f"log_day_{day_plan['day']}", use_container_width=True):
+                entries = [
+                    {
+                        "exercise_id": exercise['id'],
+                        "sets_completed": exercise.get('sets') or 1,
+                        "reps_completed": exercise.get('reps') or 0,
+                        "duration_completed": exercise.get('duration'),
+                        "weight_used": None,
+                        "notes": None
+                    }
+                    for exercise in day_plan['exercises']
+                ]
+                result = api.log_workout_batch(entries)
+                if "error" not in result:
+                    st.success(f"Logged {result['logged']} exercises for Day {day_plan['day']}!")
+                    if result['failed']:
+                        st.warning(f"{result['failed']} exercises could not be logged")
+                else:
+                    st.error(result["error"])
 
 def show_log_workout_form(exercise: Dict[str, Any], day: int):
     st.subheader(f"Log Workout: {exercise['name']}")
@@ -348,7 +461,7 @@ def show_progress_tracking():
     st.markdown("---")
     
     # Progress history
-    days_to_show = st.selectbox("Show history for:", [7, 14, 30], index=0)
+    days_to_show = st.selectbox("Show history for:", [7, 14, 30, 90, 365], index=0)
     history = api.get_progress_history(days_to_show)
     
     if history:
@@ -376,36 +489,21 @@ def show_progress_tracking():
                 labels={'total_duration': 'Duration (seconds)', 'date': 'Date'}
             )
             st.plotly_chart(fig_duration, use_container_width=True)
-        
-        # Muscle groups heatmap
-        if any(df['muscle_groups'].apply(len) > 0):
-            muscle_group_data = []
-            for _, row in df.iterrows():
-                for muscle in row['muscle_groups']:
-                    muscle_group_data.append({
-                        'date': row['date'],
-                        'muscle_group': muscle,
-                        'trained': 1
-                    })
-            
-            if muscle_group_data:
-                muscle_df = pd.DataFrame(muscle_group_data)
-                muscle_pivot = muscle_df.pivot_table(
-                    index='muscle_group', 
-                    columns='date', 
-                    values='trained', 
-                    fill_value=0
-                )
-                
-                fig_heatmap = px.imshow(
-                    muscle_pivot,
-                    title='Muscle Groups Trained (Heatmap)',
-                    labels={'color': 'Trained'},
-                    color_continuous_scale='Blues'
-                )
-                st.plotly_chart(fig_heatmap, use_container_width=True)
     else:
         st.info("No workout history found. Start logging your workouts to see progress!")
+    
+    # Muscle groups heatmap, already laid out as a grid by the backend
+    heatmap = api.get_muscle_heatmap(days_to_show)
+    if "error" not in heatmap and heatmap['muscle_groups']:
+        fig_heatmap = go.Figure(go.Heatmap(
+            z=heatmap['counts'],
+            x=heatmap['dates'],
+            y=heatmap['muscle_groups'],
+            colorscale='Blues',
+            colorbar={'title': 'Exercises'}
+        ))
+        fig_heatmap.update_layout(title='Muscle Groups Trained (Heatmap)')
+        st.plotly_chart(fig_heatmap, use_container_width=True)
 
 def show_dashboard():
     st.title("🏠 Dashboard")
@@ -456,6 +554,7 @@ def show_sidebar():
             st.session_state.token = None
             st.session_state.user_info = None
             st.session_state.current_plan = None
+            st.session_state.api_cache.clear()
             st.session_state.active_tab = "Dashboard"
             st.rerun()
 